@@ -2,7 +2,8 @@
 # encoding: utf-8
 from threading import Event
 
-from pybelt.examples_utility import belt_controller_log_to_stdout, interactive_belt_connection
+from pybelt.examples_utility import belt_controller_log_to_stdout, interactive_belt_connection, \
+    start_stdout_periodic_flush, write_stdout, disconnect_belt_on_interrupt
 from pybelt.belt_controller import BeltController, BeltConnectionState, BeltControllerDelegate
 
 """This example shows how to get updates of the belt battery level.
@@ -11,18 +12,33 @@ from pybelt.belt_controller import BeltController, BeltConnectionState, BeltCont
 # Event to stop the script
 button_pressed_event = Event()
 
+# Maximum time in seconds between two checks of Ctrl+C while waiting (an untimed wait cannot be interrupted on Windows)
+_INTERRUPT_CHECK_PERIOD = 1.0
+
 
 class Delegate(BeltControllerDelegate):
 
     def on_belt_battery_notified(self, charge_level, extra):
-        print("\rBelt battery {}%            ".format(round(charge_level, 2)), end="")
+        write_stdout("\rBelt battery {:.2f}%            ".format(charge_level))
 
     def on_belt_button_pressed(self, button_id, previous_mode, new_mode):
         button_pressed_event.set()
 
+    def on_connection_state_changed(self, state, error=None):
+        if state == BeltConnectionState.DISCONNECTED:
+            # Also wake up the main loop when the connection is lost
+            button_pressed_event.set()
+
+
+def main(setup_logger=belt_controller_log_to_stdout):
+    """Runs the example.
 
-def main():
-    belt_controller_log_to_stdout()
+    :param setup_logger: The function that configures the belt-controller logger, or `None` to keep the logger
+        configuration.
+    """
+    if setup_logger is not None:
+        setup_logger()
+    start_stdout_periodic_flush()
 
     # Interactive script to connect the belt
     belt_controller_delegate = Delegate()
@@ -31,13 +47,14 @@ def main():
     if belt_controller.get_connection_state() != BeltConnectionState.CONNECTED:
         print("Connection failed.")
         return 0
+    disconnect_belt_on_interrupt(belt_controller)
 
-    # Start battery notification (should already be started during handshake)
-    belt_controller.set_power_status_notifications(True)
+    # Activate battery notifications (this is already done in handshake)
+    # > belt_controller.set_power_status_notifications(True)
 
     print("Press a button on the belt to quit.")
-    while belt_controller.get_connection_state() == BeltConnectionState.CONNECTED and not button_pressed_event.is_set():
-        button_pressed_event.wait(timeout=0.2)
+    while not button_pressed_event.wait(_INTERRUPT_CHECK_PERIOD):
+        pass
     belt_controller.disconnect_belt()
     return 0
 
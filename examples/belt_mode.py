@@ -1,21 +1,73 @@
 #! /usr/bin/env python
 # encoding: utf-8
+import os
+import selectors
+import sys
+import threading
 
 from pybelt.examples_utility import belt_controller_log_to_stdout, interactive_belt_connection, belt_mode_to_string, \
     belt_button_id_to_string
 
 from pybelt.belt_controller import BeltController, BeltConnectionState, BeltControllerDelegate, BeltMode
 
+# Inputs to quit the example
+_QUIT_TOKENS = frozenset({"q", "quit"})
+
+# Messages printed for each belt mode
+_MODE_MESSAGES = {
+    BeltMode.STANDBY: "Belt mode is Standby.",
+    BeltMode.WAIT: "Belt mode is Wait.",
+    BeltMode.COMPASS: "Belt mode is Compass.",
+    BeltMode.APP_MODE: "Belt mode is App mode.",
+    BeltMode.PAUSE: "Belt mode is Pause.",
+    BeltMode.CALIBRATION: "Belt mode is Calibration.",
+    BeltMode.CROSSING: "Belt mode is Crossing.",
+}
+
+# Belt mode to set for each menu entry
+_MODE_ACTIONS = {
+    1: BeltMode.WAIT,
+    2: BeltMode.COMPASS,
+    3: BeltMode.APP_MODE,
+    4: BeltMode.PAUSE,
+    5: BeltMode.CROSSING,
+}
+
 
 class Delegate(BeltControllerDelegate):
 
+    def __init__(self, wake_fd=None):
+        # File descriptor written to wake up the menu loop (to print again the menu after a notification)
+        self._wake_fd = wake_fd
+        self._wake_fd_lock = threading.Lock()
+        self.connected = False
+
     def on_belt_mode_changed(self, belt_mode):
         print("Belt mode changed to {}.".format(belt_mode_to_string(belt_mode)))
         print_belt_mode(belt_mode)
+        self._wake_menu()
 
     def on_belt_button_pressed(self, button_id, previous_mode, new_mode):
         print("Belt button pressed: {}.".format(belt_button_id_to_string(button_id)))
         print_belt_mode(new_mode)
+        self._wake_menu()
+
+    def on_connection_state_changed(self, state, error=None):
+        self.connected = (state == BeltConnectionState.CONNECTED)
+        if state == BeltConnectionState.DISCONNECTED:
+            self._wake_menu()
+
+    def _wake_menu(self):
+        with self._wake_fd_lock:
+            if self._wake_fd is not None:
+                os.write(self._wake_fd, b'\x00')
+
+    def detach_wake_fd(self):
+        """
+        Stops writing to the wake-up file descriptor, so that it can be closed.
+        """
+        with self._wake_fd_lock:
+            self._wake_fd = None
 
 
 def print_belt_mode(mode):
@@ -23,64 +75,118 @@ def print_belt_mode(mode):
     Prints the belt mode.
     :param int mode: The belt mode.
     """
-    if mode is None:
-        print("Unknown mode.")
-    elif mode == BeltMode.STANDBY:
-        print("Belt mode is Standby.")
-    elif mode == BeltMode.WAIT:
-        print("Belt mode is Wait.")
-    elif mode == BeltMode.COMPASS:
-        print("Belt mode is Compass.")
-    elif mode == BeltMode.APP_MODE:
-        print("Belt mode is App mode.")
-    elif mode == BeltMode.PAUSE:
-        print("Belt mode is Pause.")
-    elif mode == BeltMode.CALIBRATION:
-        print("Belt mode is Calibration.")
-    elif mode == BeltMode.CROSSING:
-        print("Belt mode is Crossing.")
+    print(_MODE_MESSAGES.get(mode, "Unknown mode."))
 
 
-def main():
-    belt_controller_log_to_stdout()
+def print_menu():
+    """
+    Prints the menu.
+    """
+    print("Select the mode to set:")
+    print("1. Wait")
+    print("2. Compass")
+    print("3. App mode")
+    print("4. Pause")
+    print("5. Crossing")
+    print("Q to quit.")
 
-    # Interactive script to connect the belt
-    belt_controller_delegate = Delegate()
-    belt_controller = BeltController(belt_controller_delegate)
-    interactive_belt_connection(belt_controller)
-    if belt_controller.get_connection_state() != BeltConnectionState.CONNECTED:
-        print("Connection failed.")
-        return 0
-
-    while belt_controller.get_connection_state() == BeltConnectionState.CONNECTED:
-        print("Select the mode to set:")
-        print("1. Wait")
-        print("2. Compass")
-        print("3. App mode")
-        print("4. Pause")
-        print("5. Crossing")
-        print("Q to quit.")
-        action = input()
+
+def wait_actions(selector, wake_read_fd, input_buffer):
+    """
+    Waits for input lines or a wake-up of the delegate.
+
+    `stdin` is read directly from its file descriptor, the buffered `sys.stdin` would keep pasted lines that the
+    selector does not see.
+
+    :param selectors.BaseSelector selector: The selector on `stdin` and the wake-up pipe.
+    :param int wake_read_fd: The read end of the wake-up pipe.
+    :param bytearray input_buffer: The incomplete input line, kept between calls.
+    :return: The complete input lines, an empty list if the delegate woke up the loop, or `None` at the end of the
+        input.
+    """
+    for key, _ in selector.select():
+        if key.fileobj == wake_read_fd:
+            os.read(wake_read_fd, 1024)
+        else:
+            data = os.read(sys.stdin.fileno(), 1024)
+            if not data:
+                return None
+            input_buffer += data
+    lines = input_buffer.split(b'\n')
+    input_buffer[:] = lines.pop()
+    return [line.decode(errors="replace").strip() for line in lines]
+
+
+def menu_loop(belt_controller, belt_controller_delegate, selector, wake_read_fd):
+    """
+    Prints the menu and processes the inputs until the belt is disconnected.
+
+    :param BeltController belt_controller: The belt controller.
+    :param Delegate belt_controller_delegate: The delegate of the belt controller.
+    :param selectors.BaseSelector selector: The selector on `stdin` and the wake-up pipe, or `None` to use `input()`.
+    :param int wake_read_fd: The read end of the wake-up pipe.
+    """
+    input_buffer = bytearray()
+    pending_actions = []
+    while belt_controller_delegate.connected:
+        if not pending_actions:
+            print_menu()
+            if selector is None:
+                pending_actions.append(input())
+            else:
+                actions = wait_actions(selector, wake_read_fd, input_buffer)
+                if actions is None:
+                    # End of input
+                    belt_controller.disconnect_belt()
+                    break
+                # Note: No action when the delegate printed a notification, print again the menu
+                pending_actions.extend(actions)
+                continue
+        action = pending_actions.pop(0)
+        if action.casefold() in _QUIT_TOKENS:
+            belt_controller.disconnect_belt()
+            continue
         try:
             action_int = int(action)
-            if action_int == 1:
-                belt_controller.set_belt_mode(BeltMode.WAIT)
-            elif action_int == 2:
-                belt_controller.set_belt_mode(BeltMode.COMPASS)
-            elif action_int == 3:
-                belt_controller.set_belt_mode(BeltMode.APP_MODE)
-            elif action_int == 4:
-                belt_controller.set_belt_mode(BeltMode.PAUSE)
-            elif action_int == 5:
-                belt_controller.set_belt_mode(BeltMode.CROSSING)
         except ValueError:
-            if action.lower() == "q" or action.lower() == "quit":
-                belt_controller.disconnect_belt()
-            else:
-                print("Unrecognized input.")
+            print("Unrecognized input.")
+            continue
+        mode = _MODE_ACTIONS.get(action_int)
+        if mode is not None:
+            belt_controller.set_belt_mode(mode)
+        else:
+            print("Unrecognized input.")
 
-    return 0
 
+def main():
+    belt_controller_log_to_stdout()
+
+    # Pipe to wake up the menu loop on notifications (selectors do not support `stdin` on Windows)
+    # Note: Redirected input is read with `input()`, lines may already be buffered in `sys.stdin` by the connection
+    selector = None
+    wake_read_fd, wake_write_fd = None, None
+    if sys.platform != "win32" and sys.stdin.isatty():
+        wake_read_fd, wake_write_fd = os.pipe()
+        selector = selectors.DefaultSelector()
+        selector.register(sys.stdin, selectors.EVENT_READ)
+        selector.register(wake_read_fd, selectors.EVENT_READ)
+
+    # Interactive script to connect the belt
+    belt_controller_delegate = Delegate(wake_write_fd)
+    belt_controller = BeltController(belt_controller_delegate)
+    try:
+        interactive_belt_connection(belt_controller)
+        if belt_controller.get_connection_state() != BeltConnectionState.CONNECTED:
+            print("Connection failed.")
+            return 0
+        menu_loop(belt_controller, belt_controller_delegate, selector, wake_read_fd)
+    finally:
+        if selector is not None:
+            belt_controller_delegate.detach_wake_fd()
+            selector.close()
+            os.close(wake_read_fd)
+            os.close(wake_write_fd)
+    return 0
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -3,35 +3,57 @@
 import time
 from threading import Event
 
-from pybelt.examples_utility import belt_controller_log_to_stdout, interactive_belt_connection
+from pybelt.examples_utility import belt_controller_log_to_stdout, interactive_belt_connection, \
+    start_stdout_periodic_flush, write_stdout, disconnect_belt_on_interrupt
 from pybelt.belt_controller import BeltController, BeltConnectionState, BeltControllerDelegate
 
-# Event to stop the script
-button_pressed_event = Event()
+# Format method of the orientation line (bound once instead of on each display)
+_FORMAT_ORIENTATION = "\rBelt heading: {}°\t (period: {:.3f}s)            ".format
+
+# Maximum period in seconds between two checks of the main loop (the loop is woken up by the delegate events)
+_MAX_WAIT_PERIOD = 0.1
 
 
 class Delegate(BeltControllerDelegate):
 
     def __init__(self):
-        self.heading = -1
-        self.period = -1.0
-        self._last_orientation_notification_time = -1.0
+        self.connected = False
+        self.button_pressed = False
+        self._last_notification_time = None
+        # Latest (heading, period in seconds) notified, displayed by the main loop
+        # Note: The tuple is replaced as a whole so that no lock is required between the two threads
+        self.orientation = (-1, -1.0)
+        # Event to wake up the main loop (orientation update, button press or disconnection)
+        self.orientation_event = Event()
 
     def on_belt_orientation_notified(self, heading, is_orientation_accurate, extra):
-        self.heading = heading
-        current_time = time.time()
-        if self._last_orientation_notification_time > 0.0 :
-            self.period = current_time - self._last_orientation_notification_time
-        print("\rBelt heading: {}°\t (period: {:.3f}s)            ".format(
-            self.heading, self.period), end="")
-        self._last_orientation_notification_time = current_time
+        # No terminal output here to keep the notification callback short
+        current_time = time.perf_counter()
+        period = -1.0
+        if self._last_notification_time is not None:
+            period = current_time - self._last_notification_time
+        self.orientation = (heading, period)
+        self.orientation_event.set()
+        self._last_notification_time = current_time
 
     def on_belt_button_pressed(self, button_id, previous_mode, new_mode):
-        button_pressed_event.set()
+        self.button_pressed = True
+        self.orientation_event.set()
+
+    def on_connection_state_changed(self, state, error=None):
+        self.connected = (state == BeltConnectionState.CONNECTED)
+        self.orientation_event.set()
+
 
+def main(setup_logger=belt_controller_log_to_stdout):
+    """Runs the example.
 
-def main():
-    belt_controller_log_to_stdout()
+    :param setup_logger: The function that configures the belt-controller logger, or `None` to keep the logger
+        configuration.
+    """
+    if setup_logger is not None:
+        setup_logger()
+    start_stdout_periodic_flush()
 
     # Interactive script to connect the belt
     belt_controller_delegate = Delegate()
@@ -40,14 +62,18 @@ def main():
     if belt_controller.get_connection_state() != BeltConnectionState.CONNECTED:
         print("Connection failed.")
         return 0
+    disconnect_belt_on_interrupt(belt_controller)
 
     # Activate orientation notifications (this is already done in handshake)
     # > belt_controller.set_orientation_notifications(True)
 
     print("Press a button on the belt to quit.")
     # Loop to allows for terminal display
-    while belt_controller.get_connection_state() == BeltConnectionState.CONNECTED and not button_pressed_event.is_set():
-        button_pressed_event.wait(timeout=0.2)
+    while belt_controller_delegate.connected and not belt_controller_delegate.button_pressed:
+        if belt_controller_delegate.orientation_event.wait(timeout=_MAX_WAIT_PERIOD):
+            belt_controller_delegate.orientation_event.clear()
+            heading, period = belt_controller_delegate.orientation
+            write_stdout(_FORMAT_ORIENTATION(heading, period))
 
     # Deactivate orientation notification is not necessary
     # > belt_controller.set_orientation_notifications(False)
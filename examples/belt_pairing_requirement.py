@@ -3,15 +3,42 @@
 from pybelt.examples_utility import belt_controller_log_to_stdout, interactive_belt_connection
 from pybelt.belt_controller import BeltController, BeltConnectionState, BeltControllerDelegate, BeltMode
 
+# Inputs to quit the example
+_QUIT_TOKENS = frozenset({"q", "quit"})
+
+# Menu printed as prompt of each input
+_MENU_TEXT = "\n".join([
+    "Select the setting:",
+    "1. Pairing required (temporary)",
+    "2. Pairing not required (temporary)",
+    "3. Pairing required (saved)",
+    "4. Pairing not required (saved)",
+    "Q to quit."
+]) + "\n"
+
+# Arguments of `set_pairing_requirement` (pairing_required, save) for each menu entry
+_PAIRING_ACTIONS = {
+    1: (True, False),
+    2: (False, False),
+    3: (True, True),
+    4: (False, True),
+}
+
 
 class Delegate(BeltControllerDelegate):
 
+    def __init__(self):
+        self.connected = False
+
     def on_pairing_requirement_notified(self, pairing_required):
         if pairing_required:
             print("Pairing set as required.")
         else:
             print("Pairing set as not required.")
 
+    def on_connection_state_changed(self, state, error=None):
+        self.connected = (state == BeltConnectionState.CONNECTED)
+
 
 def main():
     belt_controller_log_to_stdout()
@@ -24,29 +51,21 @@ def main():
         print("Connection failed.")
         return 0
 
-    while belt_controller.get_connection_state() == BeltConnectionState.CONNECTED:
-        print("Select the setting:")
-        print("1. Pairing required (temporary)")
-        print("2. Pairing not required (temporary)")
-        print("3. Pairing required (saved)")
-        print("4. Pairing not required (saved)")
-        print("Q to quit.")
-        action = input()
+    while belt_controller_delegate.connected:
+        action = input(_MENU_TEXT)
+        if action.casefold() in _QUIT_TOKENS:
+            belt_controller.disconnect_belt()
+            continue
         try:
             action_int = int(action)
-            if action_int == 1:
-                belt_controller.set_pairing_requirement(True, False)
-            elif action_int == 2:
-                belt_controller.set_pairing_requirement(False, False)
-            elif action_int == 3:
-                belt_controller.set_pairing_requirement(True, True)
-            elif action_int == 4:
-                belt_controller.set_pairing_requirement(False, True)
         except ValueError:
-            if action.lower() == "q" or action.lower() == "quit":
-                belt_controller.disconnect_belt()
-            else:
-                print("Unrecognized input.")
+            print("Unrecognized input.")
+            continue
+        pairing_args = _PAIRING_ACTIONS.get(action_int)
+        if pairing_args is not None:
+            belt_controller.set_pairing_requirement(*pairing_args)
+        else:
+            print("Unrecognized input.")
 
     return 0
 
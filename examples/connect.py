@@ -8,8 +8,14 @@ from pybelt.examples_utility import belt_controller_log_to_stdout, interactive_b
 from pybelt.belt_controller import BeltController, BeltConnectionState
 
 
-def main():
-    belt_controller_log_to_stdout()
+def main(setup_logger=belt_controller_log_to_stdout):
+    """Runs the example.
+
+    :param setup_logger: The function that configures the belt-controller logger, or `None` to keep the logger
+        configuration.
+    """
+    if setup_logger is not None:
+        setup_logger()
 
     # Interactive script to connect the belt
     belt_controller = BeltController()
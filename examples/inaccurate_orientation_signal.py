@@ -3,9 +3,25 @@
 from pybelt.examples_utility import belt_controller_log_to_stdout, interactive_belt_connection
 from pybelt.belt_controller import BeltController, BeltConnectionState, BeltControllerDelegate
 
+# Inputs to quit the example
+_QUIT_TOKENS = frozenset({"q", "quit"})
+
+# Menu printed as prompt of each input
+_MENU_TEXT = "\n".join([
+    "Select the setting:",
+    "1. Enable inaccurate orientation signal (temporary)",
+    "2. Disable inaccurate orientation signal (temporary)",
+    "3. Enable inaccurate orientation signal (saved)",
+    "4. Disable inaccurate orientation signal (saved)",
+    "Q to quit."
+]) + "\n"
+
 
 class Delegate(BeltControllerDelegate):
 
+    def __init__(self):
+        self.connected = False
+
     def on_inaccurate_orientation_signal_state_notified(self, signal_enabled_in_app_mode,
                                                         signal_enabled_in_compass_mode):
         if signal_enabled_in_app_mode:
@@ -13,6 +29,9 @@ class Delegate(BeltControllerDelegate):
         else:
             print("Inaccurate orientation signal disabled in application mode.")
 
+    def on_connection_state_changed(self, state, error=None):
+        self.connected = (state == BeltConnectionState.CONNECTED)
+
 
 def main():
     belt_controller_log_to_stdout()
@@ -32,29 +51,24 @@ def main():
             print("Inaccurate orientation signal enabled in application mode.")
         else:
             print("Inaccurate orientation signal disabled in application mode.")
-    while belt_controller.get_connection_state() == BeltConnectionState.CONNECTED:
-        print("Select the setting:")
-        print("1. Enable inaccurate orientation signal (temporary)")
-        print("2. Disable inaccurate orientation signal (temporary)")
-        print("3. Enable inaccurate orientation signal (saved)")
-        print("4. Disable inaccurate orientation signal (saved)")
-        print("Q to quit.")
-        action = input()
+    while belt_controller_delegate.connected:
+        action = input(_MENU_TEXT)
+        if action.casefold() in _QUIT_TOKENS:
+            belt_controller.disconnect_belt()
+            continue
         try:
             action_int = int(action)
-            if action_int == 1:
-                belt_controller.set_inaccurate_orientation_signal_state(True, False)
-            elif action_int == 2:
-                belt_controller.set_inaccurate_orientation_signal_state(False, False)
-            elif action_int == 3:
-                belt_controller.set_inaccurate_orientation_signal_state(True, True)
-            elif action_int == 4:
-                belt_controller.set_inaccurate_orientation_signal_state(False, True)
         except ValueError:
-            if action.lower() == "q" or action.lower() == "quit":
-                belt_controller.disconnect_belt()
-            else:
-                print("Unrecognized input.")
+            print("Unrecognized input.")
+            continue
+        if action_int == 1:
+            belt_controller.set_inaccurate_orientation_signal_state(True, False)
+        elif action_int == 2:
+            belt_controller.set_inaccurate_orientation_signal_state(False, False)
+        elif action_int == 3:
+            belt_controller.set_inaccurate_orientation_signal_state(True, True)
+        elif action_int == 4:
+            belt_controller.set_inaccurate_orientation_signal_state(False, True)
 
     return 0
 
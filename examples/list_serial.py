@@ -1,9 +1,7 @@
 #! /usr/bin/env python
 # encoding: utf-8
 
-import serial
-import pybelt
-from serial.tools import list_ports
+from serial.tools.list_ports import comports
 
 from pybelt.examples_utility import belt_controller_log_to_stdout
 
@@ -12,7 +10,7 @@ def main():
     belt_controller_log_to_stdout()
 
     # Retrieve the list of serial COM ports
-    ports = serial.tools.list_ports.comports()
+    ports = comports()
 
     # Output
     if ports is None or len(ports) == 0:
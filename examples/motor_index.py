@@ -4,10 +4,23 @@ from pybelt.examples_utility import belt_controller_log_to_stdout, interactive_b
 from pybelt.belt_controller import BeltController, BeltConnectionState, BeltControllerDelegate, BeltMode, \
     BeltOrientationType, BeltVibrationTimerOption
 
+# Inputs to quit the example
+_QUIT_TOKENS = frozenset({"q", "quit"})
+
+# Menu printed as prompt of each input
+_MENU_TEXT = "\n".join([
+    "Q to quit.",
+    "Motor index (0-15)?"
+]) + "\n"
+
 
 class Delegate(BeltControllerDelegate):
-    # Belt controller delegate
-    pass
+
+    def __init__(self):
+        self.connected = False
+
+    def on_connection_state_changed(self, state, error=None):
+        self.connected = (state == BeltConnectionState.CONNECTED)
 
 
 def main():
@@ -24,36 +37,32 @@ def main():
     # Change belt mode to APP mode
     belt_controller.set_belt_mode(BeltMode.APP_MODE)
 
-    while belt_controller.get_connection_state() == BeltConnectionState.CONNECTED:
-        print("Q to quit.")
-        print("Motor index (0-15)?")
-
-        action = input()
+    while belt_controller_delegate.connected:
+        action = input(_MENU_TEXT)
+        if action.casefold() in _QUIT_TOKENS:
+            belt_controller.disconnect_belt()
+            continue
         try:
             action_int = int(action)
-            motor_index = (action_int % 16)
-            if motor_index < 0:
-                action_int += 16
-            belt_controller.send_pulse_command(
-                channel_index=1,
-                orientation_type=BeltOrientationType.MOTOR_INDEX,
-                orientation=motor_index,
-                intensity=None,
-                on_duration_ms=250,
-                pulse_period=1000,
-                pulse_iterations=1,
-                series_period=1000,
-                series_iterations=0,
-                timer_option=BeltVibrationTimerOption.RESET_TIMER,
-                exclusive_channel=False,
-                clear_other_channels=False
-            )
-
         except ValueError:
-            if action.lower() == "q" or action.lower() == "quit":
-                belt_controller.disconnect_belt()
-            else:
-                print("Unrecognized input.")
+            print("Unrecognized input.")
+            continue
+        # Negative indexes are counted from the last motor (e.g. -1 is motor 15)
+        motor_index = action_int & 0xF
+        belt_controller.send_pulse_command(
+            channel_index=1,
+            orientation_type=BeltOrientationType.MOTOR_INDEX,
+            orientation=motor_index,
+            intensity=None,
+            on_duration_ms=250,
+            pulse_period=1000,
+            pulse_iterations=1,
+            series_period=1000,
+            series_iterations=0,
+            timer_option=BeltVibrationTimerOption.RESET_TIMER,
+            exclusive_channel=False,
+            clear_other_channels=False
+        )
 
     return 0
 
@@ -5,6 +5,9 @@ import pybelt
 from pybelt.examples_utility import belt_controller_log_to_stdout
 from pybelt.belt_scanner import BeltScanner
 
+# Duration of the scan in seconds
+_SCAN_TIMEOUT = 5.0
+
 
 def main():
     belt_controller_log_to_stdout()
@@ -12,12 +15,12 @@ def main():
     # Scan
     with pybelt.belt_scanner.create() as scanner:
         print("Start scan.")
-        belts = scanner.scan()
+        belts = scanner.scan(timeout=_SCAN_TIMEOUT)
         print("Scan completed.")
 
     # Alternative:
     # scanner = BeltScanner()
-    # belts = scanner.scan()
+    # belts = scanner.scan(timeout=_SCAN_TIMEOUT)
     # scanner.close()
 
     # Output
@@ -1,10 +1,27 @@
 #! /usr/bin/env python
 # encoding: utf-8
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 import pybelt
 from pybelt.examples_utility import belt_controller_log_to_stdout
-from pybelt.belt_controller import BeltController, BeltConnectionState
+from pybelt.belt_controller import BeltController, BeltConnectionState, BeltControllerDelegate
 from pybelt.belt_scanner import BeltScanner
 
+# Duration of each BLE scan in seconds (the belts found are accumulated over the scans)
+_SCAN_TIMEOUT = 2.0
+
+# Maximum time in seconds to wait for the disconnection of a belt
+_DISCONNECTION_TIMEOUT = 5.0
+
+
+class Delegate(BeltControllerDelegate):
+
+    def __init__(self):
+        self.connected = False
+
+    def on_connection_state_changed(self, state, error=None):
+        self.connected = (state == BeltConnectionState.CONNECTED)
+
 
 def main():
     belt_controller_log_to_stdout()
@@ -16,56 +33,68 @@ def main():
 
     # Scan for available belts
     scan_belt = True
+    found_belts = {}  # Belts found by all scans, by address
     belts = []
-    while scan_belt:
-        with pybelt.belt_scanner.create() as scanner:
+    # The same scanner is used for all scans
+    with pybelt.belt_scanner.create() as scanner:
+        while scan_belt:
             print("Start BLE scan.")
-            belts = scanner.scan()
+            for belt in scanner.scan(timeout=_SCAN_TIMEOUT):
+                found_belts[belt.address] = belt
             print("BLE scan completed.")
-        if len(belts) == 0:
-            scan_again = input("No belt found. Scan again or Quit? [s, q]")
-            if scan_again.lower() != "s":
-                return 0
-        else:
-            # Print list of belts
-            if len(belts) == 1:
-                print("1 belt found:")
+            belts = list(found_belts.values())
+            if len(belts) == 0:
+                scan_again = input("No belt found. Scan again or Quit? [s, q]")
+                if scan_again.lower() != "s":
+                    return 0
             else:
-                print("{} belts found:".format(len(belts)))
-            for i, belt in enumerate(belts):
-                print("{}. {} - {}".format((i + 1), belt.name, belt.address))
-            scan_again = input("Connect, Scan again, or Quit? [c, s, q]")
-            if scan_again.lower() == "s":
-                belts = []
-            elif scan_again.lower() == "c":
-                scan_belt = False
+                # Print list of belts
+                if len(belts) == 1:
+                    print("1 belt found:")
+                else:
+                    print("{} belts found:".format(len(belts)))
+                for i, belt in enumerate(belts):
+                    print("{}. {} - {}".format((i + 1), belt.name, belt.address))
+                scan_again = input("Connect, Scan again, or Quit? [c, s, q]")
+                if scan_again.lower() == "c":
+                    scan_belt = False
+                elif scan_again.lower() != "s":
+                    return 0
+
+    # Connect to all available belts (in parallel, each connection waits for the handshake of its belt)
+    # Note: Delegates and controllers are created at once, each connection only updates the delegate of its index
+    belt_count = len(belts)
+    belt_controller_delegates = [Delegate() for _ in range(belt_count)]
+    belt_controllers = [BeltController(delegate, ble_throughput_optimized=True)
+                        for delegate in belt_controller_delegates]
+    with ThreadPoolExecutor(max_workers=belt_count) as executor:
+        connections = {}
+        for i, belt in enumerate(belts):
+            print("Connect belt: {}. {} - {}".format((i + 1), belt.name, belt.address))
+            connections[executor.submit(belt_controllers[i].connect, belt)] = i
+        for connection in as_completed(connections):
+            i = connections[connection]
+            try:
+                connection.result()
+            except Exception as error:
+                print("Belt connection error: {}. {} - {} ({})".format(
+                    (i + 1), belts[i].name, belts[i].address, error))
+            if belt_controller_delegates[i].connected:
+                print("Belt connected: {}. {} - {}".format((i + 1), belts[i].name, belts[i].address))
             else:
-                return 0
-
-    # Connect to all available belts
-    belt_controllers = []
-    for i, belt in enumerate(belts):
-        print("Connect belt: {}. {} - {}".format((i + 1), belt.name, belt.address))
-        belt_controller = BeltController()
-        belt_controller.connect(belts[i])
-        belt_controllers.append(belt_controller)
-        if belt_controller.get_connection_state() == BeltConnectionState.CONNECTED:
-            print("Belt connected.")
-        else:
-            print("Belt connection failed.")
+                print("Belt connection failed: {}. {} - {}".format((i + 1), belts[i].name, belts[i].address))
     print("All connection attempts done.")
 
     # Summary
-    connected_belt_count = 0
-    for belt_controller in belt_controllers:
-        if belt_controller.get_connection_state() == BeltConnectionState.CONNECTED:
-            connected_belt_count += 1
-    print("Belt connected {}/{}".format(connected_belt_count, len(belt_controllers)))
+    connected_belt_count = sum(delegate.connected for delegate in belt_controller_delegates)
+    print("Belt connected {}/{}".format(connected_belt_count, belt_count))
     input("Press enter to disconnect and quit.")
 
-    # Disconnect all belts
+    # Disconnect all belts (start all disconnections before waiting)
+    for belt_controller in belt_controllers:
+        belt_controller.request_disconnect()
     for belt_controller in belt_controllers:
-        belt_controller.disconnect_belt()
+        belt_controller.wait_disconnected(_DISCONNECTION_TIMEOUT)
 
     return 0
 
@@ -1,13 +1,142 @@
 #! /usr/bin/env python
 # encoding: utf-8
+import os
+import selectors
+import sys
+import time
+from functools import partial
+
 from pybelt.examples_utility import belt_controller_log_to_stdout, interactive_belt_connection
 from pybelt.belt_controller import BeltController, BeltConnectionState, BeltControllerDelegate, BeltMode, \
     BeltVibrationPattern, BeltOrientationType
 
+if sys.platform == "win32":
+    import msvcrt
+else:
+    msvcrt = None
+
+# Inputs to quit the example
+_QUIT_TOKENS = frozenset({"q", "quit"})
+
+# Menu printed before each input
+_MENU_TEXT = "\n".join([
+    "Q to quit.",
+    "0: Stop vibration.",
+    "1: Start vibration on the right (channel 0).",
+    "2: Start vibration toward West (channel 1).",
+    "3: Start vibration on the left for 3 seconds (channel 2)."
+]) + "\n"
+
+# Period in seconds for checking the connection state while waiting for an input
+_INPUT_POLL_PERIOD = 0.25
+
 
 class Delegate(BeltControllerDelegate):
-    # Belt controller delegate
-    pass
+
+    def __init__(self):
+        self.connected = False
+
+    def on_connection_state_changed(self, state, error=None):
+        self.connected = (state == BeltConnectionState.CONNECTED)
+
+
+def wait_action(delegate, selector, input_buffer):
+    """
+    Waits for an input line while the belt is connected.
+
+    The terminal input is read directly (from the file descriptor of `stdin`, or character by character on Windows),
+    so that the connection state is checked while a line is typed and pasted lines are not kept in the buffer of
+    `sys.stdin`. Redirected input is read line by line without checking the connection state.
+
+    :param Delegate delegate: The belt-controller delegate.
+    :param selectors.BaseSelector selector: The selector on `stdin`, or `None` on Windows and for redirected input.
+    :param bytearray input_buffer: The input received but not returned yet, kept between calls.
+    :return: The input line, or `None` if the belt is disconnected or at the end of the input.
+    """
+    console_input = selector is None and msvcrt is not None and sys.stdin.isatty()
+    if selector is None and not console_input:
+        line = sys.stdin.readline()
+        if not line:
+            return None
+        return line.strip()
+    while delegate.connected:
+        end_of_line = input_buffer.find(b'\n')
+        if end_of_line >= 0:
+            line = bytes(input_buffer[:end_of_line])
+            del input_buffer[:end_of_line + 1]
+            return line.decode(errors="replace").strip()
+        if selector is not None:
+            if selector.select(timeout=_INPUT_POLL_PERIOD):
+                data = os.read(sys.stdin.fileno(), 1024)
+                if not data:
+                    return None
+                input_buffer += data
+        elif msvcrt.kbhit():
+            # Selectors do not support `stdin` on Windows, characters are read (and echoed) one by one
+            char = msvcrt.getwche()
+            if char == '\r':
+                msvcrt.putwch('\n')
+                input_buffer += b'\n'
+            elif char == '\b':
+                if input_buffer:
+                    input_buffer.pop()
+                msvcrt.putwch(' ')
+                msvcrt.putwch('\b')
+            else:
+                input_buffer += char.encode()
+        else:
+            time.sleep(_INPUT_POLL_PERIOD)
+    return None
+
+
+def encode_vibration_commands(belt_controller):
+    """
+    Encodes the vibration commands of the menu.
+
+    :param BeltController belt_controller: The belt controller.
+    :return: The encoded vibration commands by menu entry.
+    """
+    return {
+        # Vibration on the right (same as `vibrate_at_angle(90, channel_index=0)`)
+        1: belt_controller.encode_vibration_command(
+            channel_index=0,
+            pattern=BeltVibrationPattern.CONTINUOUS,
+            intensity=None,
+            orientation_type=BeltOrientationType.ANGLE,
+            orientation=90,
+            pattern_iterations=None,
+            pattern_period=500,
+            pattern_start_time=0,
+            exclusive_channel=False,
+            clear_other_channels=False
+        ),
+        # Vibration toward West (same as `vibrate_at_magnetic_bearing(270, channel_index=1)`)
+        2: belt_controller.encode_vibration_command(
+            channel_index=1,
+            pattern=BeltVibrationPattern.CONTINUOUS,
+            intensity=None,
+            orientation_type=BeltOrientationType.MAGNETIC_BEARING,
+            orientation=270,
+            pattern_iterations=None,
+            pattern_period=500,
+            pattern_start_time=0,
+            exclusive_channel=False,
+            clear_other_channels=False
+        ),
+        # Vibration on the left for 3 seconds
+        3: belt_controller.encode_vibration_command(
+            channel_index=2,
+            pattern=BeltVibrationPattern.CONTINUOUS,
+            intensity=None,
+            orientation_type=BeltOrientationType.ANGLE,
+            orientation=270,
+            pattern_iterations=1,
+            pattern_period=3000,
+            pattern_start_time=0,
+            exclusive_channel=False,
+            clear_other_channels=False
+        )
+    }
 
 
 def main():
@@ -15,7 +144,7 @@ def main():
 
     # Interactive script to connect the belt
     belt_controller_delegate = Delegate()
-    belt_controller = BeltController(belt_controller_delegate)
+    belt_controller = BeltController(belt_controller_delegate, ble_throughput_optimized=True)
     interactive_belt_connection(belt_controller)
     if belt_controller.get_connection_state() != BeltConnectionState.CONNECTED:
         print("Connection failed.")
@@ -24,42 +153,42 @@ def main():
     # Change belt mode to APP mode
     belt_controller.set_belt_mode(BeltMode.APP_MODE)
 
-    while belt_controller.get_connection_state() == BeltConnectionState.CONNECTED:
-        print("Q to quit.")
-        print("0: Stop vibration.")
-        print("1: Start vibration on the right (channel 0).")
-        print("2: Start vibration toward West (channel 1).")
-        print("3: Start vibration on the left for 3 seconds (channel 2).")
-        action = input()
+    # Actions of the menu, the vibration commands are encoded once
+    menu_actions = {0: belt_controller.stop_vibration}
+    for action_int, packet in encode_vibration_commands(belt_controller).items():
+        menu_actions[action_int] = partial(belt_controller.send_vibration_packet, packet)
+
+    # Selector to check the connection state while waiting for an input
+    selector = None
+    if sys.platform != "win32" and sys.stdin.isatty():
+        selector = selectors.DefaultSelector()
+        selector.register(sys.stdin, selectors.EVENT_READ)
+
+    input_buffer = bytearray()
+    while belt_controller_delegate.connected:
+        sys.stdout.write(_MENU_TEXT)
+        sys.stdout.flush()
+        action = wait_action(belt_controller_delegate, selector, input_buffer)
+        if action is None:
+            # Disconnected or end of input
+            belt_controller.disconnect_belt()
+            break
+        if action.casefold() in _QUIT_TOKENS:
+            belt_controller.disconnect_belt()
+            continue
         try:
             action_int = int(action)
-            if action_int == 0:
-                belt_controller.stop_vibration()
-            elif action_int == 1:
-                belt_controller.vibrate_at_angle(90, channel_index=0)
-            elif action_int == 2:
-                belt_controller.vibrate_at_magnetic_bearing(270, channel_index=1)
-            elif action_int == 3:
-                belt_controller.send_vibration_command(
-                    channel_index=2,
-                    pattern=BeltVibrationPattern.CONTINUOUS,
-                    intensity=None,
-                    orientation_type=BeltOrientationType.ANGLE,
-                    orientation=270,
-                    pattern_iterations=1,
-                    pattern_period=3000,
-                    pattern_start_time=0,
-                    exclusive_channel=False,
-                    clear_other_channels=False
-                )
-            else:
-                print("Unrecognized input.")
         except ValueError:
-            if action.lower() == "q" or action.lower() == "quit":
-                belt_controller.disconnect_belt()
-            else:
-                print("Unrecognized input.")
+            print("Unrecognized input.")
+            continue
+        menu_action = menu_actions.get(action_int)
+        if menu_action is not None:
+            menu_action()
+        else:
+            print("Unrecognized input.")
 
+    if selector is not None:
+        selector.close()
     return 0
 
 
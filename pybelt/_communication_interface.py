@@ -1,5 +1,8 @@
 # Copyright 2020, feelSpace GmbH, <info@feelspace.de>
 import asyncio
+import collections
+import concurrent.futures
+import contextvars
 import queue
 import sys
 import threading
@@ -14,6 +17,9 @@ from pybelt import belt_scanner
 
 from pybelt._gatt_profile import *
 
+# Logger (shared by all instances)
+_logger = logging.getLogger(__name__)
+
 SERIAL_BAUDRATE = 115200
 # Baudrate for serial connection
 
@@ -27,12 +33,28 @@ SERIAL_PACKET_TIMEOUT = 2.5
 # Timeout to read a complete packet on serial port
 
 SERIAL_FLUSH_INPUT_TIMEOUT = 1.50
-# Timeout for flushing serial input
+# Maximum duration for flushing serial input
+
+SERIAL_BINARY_READY_TIMEOUT = 0.5
+# Maximum time to wait for the first GATT packet when opening a serial connection
+
+BLE_WRITE_TIMEOUT = 10.0
+# Maximum time to wait for the completion of a queued BLE write (including the writes queued before it)
 
-EVENT_LOOP_READY_TIMEOUT = 1.0
+_GATT_PARSER_HANDLE = 0
+# Serial GATT parser state: waiting for the attribute handle of a packet
 
+_GATT_PARSER_LENGTH = 1
+# Serial GATT parser state: waiting for the data length of a packet
 
-# Timeout for initializing the event loop in BLE interface
+_GATT_PARSER_PAYLOAD = 2
+# Serial GATT parser state: waiting for the data of a packet
+
+SERIAL_MAX_PACKET_SIZE = 2 + 255
+# Maximum size of a GATT packet on serial port (handle, length and data)
+
+_TEXT_ACCEPTED_BYTES = bytes(1 if (b == 0x0D or b == 0x0A or 32 <= b <= 127) else 0 for b in range(256))
+# Lookup table of bytes accepted in text parse mode (CR, LF and printable ASCII)
 
 
 def decode_ascii(byte_msg) -> str:
@@ -46,14 +68,8 @@ def decode_ascii(byte_msg) -> str:
     """
     if len(byte_msg) == 0:
         return ""
-    try:
-        for i in range(0, len(byte_msg)):
-            if byte_msg[i] < 0 or byte_msg[i] > 255:
-                byte_msg[i] = 35
-        msg = bytes(byte_msg).decode('ascii', 'replace')
-        return msg
-    except:
-        return "### FORMAT ERROR ###"
+    # Note: Bytes are always in range [0, 255], non-ASCII bytes are replaced
+    return bytes(byte_msg).decode('ascii', 'replace')
 
 
 class ParseMode:
@@ -87,7 +103,7 @@ class BeltCommunicationDelegate:
         Called when a GATT notification has been received or a characteristic has been read.
 
         :param GattCharacteristic gatt_char: The characteristic that received the data.
-        :param bytes data: The data received.
+        :param bytes data: The data received (bytes-like object, e.g. bytearray).
         """
         pass
 
@@ -194,7 +210,7 @@ class SerialPortInterface(threading.Thread, BeltCommunicationInterface):
         self._delegate = delegate
 
         # Logger
-        self.logger = logging.getLogger(__name__)
+        self.logger = _logger
 
         # Flag for stopping the thread
         self.stop_flag = False
@@ -207,14 +223,37 @@ class SerialPortInterface(threading.Thread, BeltCommunicationInterface):
         # Variable for packet timeout
         self._packet_start_time = time.perf_counter()
 
-        # Input & Output lock
-        self._serial_port_lock = threading.RLock()
+        # Event set when the first GATT packet is received (binary communication started)
+        self._binary_ready = threading.Event()
+        # Event set when the serial port is closed by the listener
+        self._disconnected_event = threading.Event()
+        self._disconnected_event.set()
 
-        # Python version
-        self._PY3 = sys.version_info > (3,)
+        # Input & Output lock (never acquired recursively)
+        self._serial_port_lock = threading.Lock()
+        # Packets waiting for the output lock, written together by the lock holder
+        self._tx_queue = collections.deque()
 
         # GATT profile
         self._gatt_profile = get_usb_gatt_profile()
+        # Characteristics by attribute handle (the handle of serial packets is a single byte), frozen once built
+        handle_table = [None] * 256
+        for gatt_char in self._gatt_profile.characteristics:
+            for handle in gatt_char.get_all_handles():
+                if 0 <= handle <= 255:
+                    handle_table[handle] = gatt_char
+        self._handle_table = tuple(handle_table)
+        # Packets to enable/disable notifications and to read characteristics, by value handle
+        self._enable_notifications_packets = {}
+        self._disable_notifications_packets = {}
+        self._read_packets = {}
+        for gatt_char in self._gatt_profile.characteristics:
+            value_handle = gatt_char.value_attr.handle
+            if gatt_char.configuration_attrs:
+                configuration_handle = gatt_char.configuration_attrs[0].handle
+                self._enable_notifications_packets[value_handle] = bytes([configuration_handle, 2, 0x01, 0x00])
+                self._disable_notifications_packets[value_handle] = bytes([configuration_handle, 2, 0x00, 0x00])
+            self._read_packets[value_handle] = bytes([value_handle, 0])
 
     def open(self, port, parse_mode=ParseMode.GATT, initial_flush=True):
         """
@@ -239,24 +278,25 @@ class SerialPortInterface(threading.Thread, BeltCommunicationInterface):
             self._serial_port_name,
             SERIAL_BAUDRATE,
             timeout=SERIAL_READ_TIMEOUT)
+        self._disconnected_event.clear()
 
         # Initial flush
-        self.write_gatt_char(self._gatt_profile.param_request_char, b'\x01\x01')
         if initial_flush:
             self._flush_input()
 
         # Start listening
+        self._binary_ready.clear()
         self.start()
 
-        # Dummy command to start binary communication
+        # Dummy command to start binary communication, wait for the response
         self.write_gatt_char(self._gatt_profile.param_request_char, b'\x01\x01')
-        time.sleep(0.5)
+        self._binary_ready.wait(SERIAL_BINARY_READY_TIMEOUT)
 
         # Inform delegate
         if self._delegate is not None:
             try:
                 self._delegate.on_connection_established()
-            except:
+            except Exception:
                 pass
 
     def set_parse_mode(self, parse_mode):
@@ -284,11 +324,17 @@ class SerialPortInterface(threading.Thread, BeltCommunicationInterface):
         """Flushes the input. """
         self.logger.info("SerialPortListener: Flush input.")
         try:
-            flush_timeout = time.perf_counter() + SERIAL_FLUSH_INPUT_TIMEOUT
-            while time.perf_counter() < flush_timeout:
-                self._serial_port.reset_input_buffer()
-                time.sleep(0.05)
-        except:
+            self._serial_port.reset_input_buffer()
+            # Drain bytes received meanwhile (non-blocking reads, bounded in case the belt keeps sending data)
+            read_timeout = self._serial_port.timeout
+            self._serial_port.timeout = 0
+            try:
+                flush_timeout = time.perf_counter() + SERIAL_FLUSH_INPUT_TIMEOUT
+                while self._serial_port.read(4096) and time.perf_counter() < flush_timeout:
+                    pass
+            finally:
+                self._serial_port.timeout = read_timeout
+        except (serial.SerialException, OSError):
             self.logger.warning("SerialPortListener: Unable to flush serial input.")
 
     # --------------------------------------------------------------- #
@@ -308,39 +354,37 @@ class SerialPortInterface(threading.Thread, BeltCommunicationInterface):
             self.logger.error("BeltController: Cannot wait disconnection from listener thread.")
             return False
         self._expect_disconnection = True
-        self.join(timeout)
+        disconnected = self._disconnected_event.wait(timeout)
         self._expect_disconnection = False
-        return self.is_connected()
+        return disconnected
 
     def is_connected(self) -> bool:
         return self._serial_port is not None
 
     def write_gatt_char(self, gatt_char, data, with_response=True) -> bool:
+        # Build the packet in a single buffer: handle, length, data
+        try:
+            data_length = len(data)
+            packet = bytearray(data_length + 2)
+            packet[0] = gatt_char.value_attr.handle
+            # Allow packets larger than 255 bytes (only for supported characteristics)
+            packet[1] = data_length if data_length < 255 else 0xFF
+            packet[2:] = data
+        except (TypeError, ValueError):
+            return False
         self._wait_empty_buffer()
-        with self._serial_port_lock:
-            try:
-                if len(data) >= 255:
-                    # Allow packets larger than 255 bytes (only for supported characteristics)
-                    packet = bytes([gatt_char.value_attr.handle]) + b'\xff' + data
-                else:
-                    packet = bytes([gatt_char.value_attr.handle]) + bytes([len(data)]) + data
-                self._serial_port.write(packet)
-            except:
-                return False
-        return True
+        return self._write_packet(packet)
 
     def set_gatt_notifications(self, gatt_char, enabled) -> bool:
+        try:
+            if enabled:
+                packet = self._enable_notifications_packets[gatt_char.value_attr.handle]
+            else:
+                packet = self._disable_notifications_packets[gatt_char.value_attr.handle]
+        except KeyError:
+            return False
         self._wait_empty_buffer()
-        with self._serial_port_lock:
-            try:
-                if enabled:
-                    packet = bytes([gatt_char.configuration_attrs[0].handle, 2, 0x01, 0x00])
-                else:
-                    packet = bytes([gatt_char.configuration_attrs[0].handle, 2, 0x00, 0x00])
-                self._serial_port.write(packet)
-            except:
-                return False
-        return True
+        return self._write_packet(packet)
 
     def _wait_empty_buffer(self):
         if self._serial_port is None:
@@ -351,15 +395,44 @@ class SerialPortInterface(threading.Thread, BeltCommunicationInterface):
             if time.perf_counter() >= timeout:
                 break
 
-
-    def read_gatt_char(self, gatt_char) -> bool:
+    def _write_packet(self, packet) -> bool:
+        """
+        Writes a packet on the serial port. Packets queued by other threads while waiting for the output lock are
+        written with the same call, and all of them get the result of that call.
+        :param bytes packet: The packet to write.
+        :return: 'True' if successful, 'False' otherwise.
+        """
+        # Queued packet as [packet, result], the result is set by the lock holder that writes the packet
+        queued_packet = [packet, None]
+        self._tx_queue.append(queued_packet)
         with self._serial_port_lock:
+            if queued_packet[1] is not None:
+                # Packet already written by a previous lock holder
+                return queued_packet[1]
+            batch = []
             try:
-                packet = bytes([gatt_char.value_attr.handle, 0])
-                self._serial_port.write(packet)
-            except:
-                return False
-        return True
+                while True:
+                    batch.append(self._tx_queue.popleft())
+            except IndexError:
+                pass
+            success = False
+            serial_port = self._serial_port
+            if serial_port is not None:
+                try:
+                    serial_port.write(batch[0][0] if len(batch) == 1 else b''.join([p[0] for p in batch]))
+                    success = True
+                except (serial.SerialException, OSError):
+                    pass
+            for batch_packet in batch:
+                batch_packet[1] = success
+        return success
+
+    def read_gatt_char(self, gatt_char) -> bool:
+        try:
+            packet = self._read_packets[gatt_char.value_attr.handle]
+        except KeyError:
+            return False
+        return self._write_packet(packet)
 
     def get_gatt_profile(self) -> NaviBeltGattProfile:
         return self._gatt_profile
@@ -374,28 +447,31 @@ class SerialPortInterface(threading.Thread, BeltCommunicationInterface):
         self.stop_flag = False
         self._expect_disconnection = False
         self.logger.debug("SerialPortListener: Start listening belt.")
-        packet = None
+        packet = None  # Text line being received
+        # GATT packet being received, in a buffer reused for all packets
+        packet_buffer = bytearray(SERIAL_MAX_PACKET_SIZE)
+        packet_length = 0
+        parser_state = _GATT_PARSER_HANDLE
+        payload_length = 0
         while not self.stop_flag:
             try:
-                # Blocking until data are received or read timeout
+                # Read all available bytes at once (at least one byte, blocking until read timeout)
                 with self._serial_port_lock:
-                    data_serial = self._serial_port.read(size=1)
-                # Convert to list of int
-                if len(data_serial) > 0:
-                    in_byte = bytes([data_serial[0]])
-                else:
-                    in_byte = None
-            except:
+                    data_serial = self._serial_port.read(self._serial_port.in_waiting or 1)
+            except (serial.SerialException, OSError):
                 if not self.stop_flag and not self._expect_disconnection:
                     self.logger.exception("SerialPortListener: Error when reading on serial port.")
                 break
-            # Check for packet timeout
-            if packet is not None and len(packet) > 0:
-                if ((time.perf_counter() - self._packet_start_time) >
-                        SERIAL_PACKET_TIMEOUT):
+            # Check for packet timeout (once per chunk)
+            chunk_time = time.perf_counter()
+            if packet_length > 0 or (packet is not None and len(packet) > 0):
+                if (chunk_time - self._packet_start_time) > SERIAL_PACKET_TIMEOUT:
                     # Timeout, clear packet
-                    self.logger.error("SerialPortListener: Packet timeout. (" + decode_ascii(packet) + ")")
+                    self.logger.error("SerialPortListener: Packet timeout. (%s)",
+                                      decode_ascii(packet_buffer[:packet_length] if packet_length > 0 else packet))
                     packet = None
+                    packet_length = 0
+                    parser_state = _GATT_PARSER_HANDLE
             # Check parse mode
             if self._pending_parse_mode is not None:
                 # Change parse mode
@@ -403,84 +479,116 @@ class SerialPortInterface(threading.Thread, BeltCommunicationInterface):
                 self._pending_parse_mode = None
                 # Clear packet
                 packet = None
-            # Handle received byte (fill packet)
-            if in_byte is not None:
+                packet_length = 0
+                parser_state = _GATT_PARSER_HANDLE
+            # Handle received bytes (fill packet)
+            data_view = memoryview(data_serial)
+            data_length = len(data_serial)
+            i = 0
+            while i < data_length:
                 if self._parse_mode == ParseMode.GATT:
-                    # Fill packet
-                    if packet is None or len(packet) == 0:
-                        packet = bytearray()
+                    if parser_state == _GATT_PARSER_HANDLE:
                         # First byte is attribute handle
-                        gatt_char = self._gatt_profile.get_char_from_handle(ord(in_byte))
-                        if gatt_char is not None:
-                            packet.append(in_byte[0])
-                            self._packet_start_time = time.perf_counter()
+                        in_byte = data_serial[i]
+                        i += 1
+                        if self._handle_table[in_byte] is not None:
+                            packet_buffer[0] = in_byte
+                            packet_length = 1
+                            self._packet_start_time = chunk_time
+                            parser_state = _GATT_PARSER_LENGTH
                         else:
-                            self.logger.error("SerialPortListener: Incorrect attribute handle in packet header. (" +
-                                              decode_ascii(in_byte) + ")")
+                            self.logger.error("SerialPortListener: Incorrect attribute handle in packet header. "
+                                              "(0x%02X)", in_byte)
                             self._flush_input()
-                            # ignore byte
-                    elif len(packet) == 1:
+                            # Ignore the remaining bytes read before the flush
+                            break
+                    elif parser_state == _GATT_PARSER_LENGTH:
                         # Second byte is the data length
-                        if ord(in_byte) <= 22:
-                            packet.append(in_byte[0])
+                        in_byte = data_serial[i]
+                        i += 1
+                        if in_byte <= 22 or (in_byte <= 244 and self._handle_table[packet_buffer[0]] ==
+                                             self._gatt_profile.sensor_notification_char):
+                            # Note: Data length extension supported on sensor notifications
+                            packet_buffer[1] = in_byte
+                            packet_length = 2
+                            payload_length = in_byte
+                            parser_state = _GATT_PARSER_PAYLOAD
                         else:
-                            gatt_char = self._gatt_profile.get_char_from_handle(packet[0])
-                            if gatt_char is not None and gatt_char == self._gatt_profile.sensor_notification_char and \
-                                    ord(in_byte) <= 244:
-                                # Data length extension supported on sensor notifications
-                                packet.append(in_byte[0])
-                            else:
-                                # Incorrect length, clear received data
-                                self.logger.error("SerialPortListener: Incorrect packet length in packet header. (" +
-                                                  decode_ascii(in_byte) + ")")
-                                self._flush_input()
-                                packet = None
-                    elif len(packet) >= 2:
-                        # Complete packet to the data size
-                        packet.append(in_byte[0])
+                            # Incorrect length, clear received data
+                            self.logger.error("SerialPortListener: Incorrect packet length in packet header. "
+                                              "(0x%02X)", in_byte)
+                            self._flush_input()
+                            packet_length = 0
+                            parser_state = _GATT_PARSER_HANDLE
+                            # Ignore the remaining bytes read before the flush
+                            break
+                    else:
+                        # Copy the available part of the payload at once
+                        copy_length = min(payload_length + 2 - packet_length, data_length - i)
+                        packet_buffer[packet_length:packet_length + copy_length] = data_view[i:i + copy_length]
+                        packet_length += copy_length
+                        i += copy_length
                     # Check for complete packet
-                    if packet is not None and (len(packet) >= 2) and (len(packet) == packet[1] + 2):
+                    if parser_state == _GATT_PARSER_PAYLOAD and packet_length == payload_length + 2:
+                        if not self._binary_ready.is_set():
+                            self._binary_ready.set()
                         # Notify packet received
                         try:
-                            gatt_char = self._gatt_profile.get_char_from_handle(packet[0])
                             self._delegate.on_gatt_char_notified(
-                                gatt_char,
-                                packet[2:])
-                        except:
+                                self._handle_table[packet_buffer[0]],
+                                packet_buffer[2:packet_length])
+                        except Exception:
                             self.logger.exception("SerialPortListener: Error when handling received packet.")
-                        packet = None
+                        packet_length = 0
+                        parser_state = _GATT_PARSER_HANDLE
                 elif self._parse_mode == ParseMode.TEXT:
-                    if (ord(in_byte) == 0x0D or ord(in_byte) == 0x0A or
-                            (32 <= ord(in_byte) <= 127)):
+                    # Take the bytes up to the end of the line (or chunk)
+                    line_start = i
+                    line_end = data_serial.find(b'\n', i)
+                    line_end = data_length if line_end < 0 else line_end + 1
+                    i = line_end
+                    # Classify the bytes of the line at once (0 for incorrect bytes)
+                    line_classes = data_serial[line_start:line_end].translate(_TEXT_ACCEPTED_BYTES)
+                    invalid_index = line_classes.find(0)
+                    if invalid_index >= 0:
+                        # Ignore incorrect bytes and clear packet
+                        while invalid_index >= 0:
+                            self.logger.error("SerialPortListener: Incorrect text byte. (0x%02X)",
+                                              data_serial[line_start + invalid_index])
+                            last_invalid_index = invalid_index
+                            invalid_index = line_classes.find(0, invalid_index + 1)
+                        packet = None
+                        line_start += last_invalid_index + 1
+                    # Append the valid bytes at once
+                    if line_start < line_end:
                         if packet is None:
                             packet = bytearray()
-                        packet.append(in_byte[0])
-                    else:
-                        # Ignore byte and clear packet
-                        self.logger.error("SerialPortListener: Incorrect text byte. (" +
-                                          decode_ascii(in_byte) + ")")
-                        packet = None
+                        packet += data_view[line_start:line_end]
                     # Check for completed packet (new line)
                     if packet is not None and len(packet) > 0 and packet[-1] == 0x0A:
                         # Handle packet
                         try:
                             self._delegate.on_raw_text_received(packet)
-                        except:
+                        except Exception:
                             self.logger.exception("Error when handling received text.")
                         packet = None
+                else:
+                    break
+            data_view.release()
         self.logger.debug("SerialPortListener: Stop listening belt.")
         # Close port
         if self._serial_port is not None:
             try:
                 self._serial_port.close()
-            except:
+            except (serial.SerialException, OSError):
                 self.logger.exception("BeltController: Failed to close serial port.")
         self._serial_port = None
+        self._disconnected_event.set()
         # Inform delegate
         if self._delegate is not None:
             try:
                 self._delegate.on_connection_closed(expected=(self.stop_flag or self._expect_disconnection))
-            except:
+            except Exception:
                 pass
 
 
@@ -491,30 +599,128 @@ def print_packet(packet):
     print(packet_str)
 
 
-class BleInterface(BeltCommunicationInterface, threading.Thread):
+_ble_event_loop = None
+# Event loop shared by all BLE interfaces (started on first use)
+
+_ble_event_loop_thread = None
+# Thread running the shared BLE event loop
+
+_ble_event_loop_lock = threading.Lock()
+# Lock for starting the shared BLE event loop
+
+_BLE_CALLBACK_CONTEXT = contextvars.Context()
+# Empty context for callbacks scheduled from other threads on the BLE event loop (no context copy of the caller)
+
+
+def _get_ble_event_loop() -> asyncio.AbstractEventLoop:
+    """Returns the event loop shared by all BLE interfaces, the loop is started on first call.
+
+    :rtype asyncio.AbstractEventLoop
+        The shared event loop.
+    """
+    global _ble_event_loop, _ble_event_loop_thread
+    with _ble_event_loop_lock:
+        if _ble_event_loop is None:
+            _ble_event_loop = asyncio.new_event_loop()
+            if sys.version_info >= (3, 12):
+                # Run coroutines synchronously until their first suspension (e.g. checks before Bleak calls)
+                _ble_event_loop.set_task_factory(asyncio.eager_task_factory)
+            _ble_event_loop_thread = threading.Thread(
+                target=_run_ble_event_loop, args=(_ble_event_loop,), name="BleEventLoop", daemon=True)
+            _ble_event_loop_thread.start()
+        return _ble_event_loop
+
+
+def _run_ble_event_loop(event_loop):
+    """Runs the shared BLE event loop (target of the event loop thread).
+
+    :param asyncio.AbstractEventLoop event_loop:
+        The event loop to run.
+    """
+    asyncio.set_event_loop(event_loop)
+    _logger.debug("BleInterface: Event loop started.")
+    event_loop.run_forever()
+
+
+class _PendingWrite:
+    """A write operation waiting in the BLE write queue.
+    """
+
+    __slots__ = ('gatt_char', 'data', 'with_response', 'success', '_done_lock')
+
+    def __init__(self, gatt_char, data, with_response):
+        """
+        Initializes a pending write operation.
+        :param GattCharacteristic gatt_char: The characteristic to write.
+        :param bytes data: The data to write.
+        :param bool with_response: 'True' to write with response, 'False' to write without response.
+        """
+        self.gatt_char = gatt_char
+        self.data = data
+        self.with_response = with_response
+        self.success = False
+        # Note: A plain lock held until completion is lighter than a future or an event (no condition variable)
+        self._done_lock = threading.Lock()
+        self._done_lock.acquire()
+
+    def complete(self, success):
+        """
+        Sets the result of the write operation and releases the waiting thread.
+        :param bool success: 'True' if the write operation succeeded.
+        """
+        self.success = success
+        self._done_lock.release()
+
+    def wait(self, timeout=BLE_WRITE_TIMEOUT) -> bool:
+        """
+        Waits for the completion of the write operation.
+        :param float timeout: The maximum time to wait in seconds.
+        :return: 'True' if the write operation succeeded, 'False' if it failed or did not complete in time.
+        """
+        if not self._done_lock.acquire(timeout=timeout):
+            _logger.error("BleInterface: Timeout when writing characteristic!")
+            return False
+        return self.success
+
+
+class BleInterface(BeltCommunicationInterface):
     """Serial port interface.
     """
 
     # --------------------------------------------------------------- #
     # Public methods
 
-    def __init__(self, delegate):
+    def __init__(self, delegate, throughput_optimized=False, latest_only_uuids=None):
         """Initializes the BLE interface.
 
         :param BeltCommunicationDelegate delegate:
             The delegate that handles received notifications.
+        :param bool throughput_optimized:
+            `True` to request throughput-optimized connection parameters (short connection interval) once connected.
+            This is only supported on Windows 11.
+        :param Iterable[str] latest_only_uuids:
+            UUIDs of streamed characteristics (e.g. orientation data) for which pending notifications are replaced by
+            newer ones when the delegate is late, or `None` to pass all notifications to the delegate.
         """
-        threading.Thread.__init__(self, name="BleInterfaceThread")
         self._device = None
         self._delegate = delegate
         self._gatt_client = None  # type: Optional[BleakClient]
+        self._connected = False  # Connection state of the GATT client, updated on connection and disconnection
+        self._notified_chars = {}  # Characteristics by Bleak characteristic handle
+        self._throughput_optimized = throughput_optimized
+        self._latest_only_uuids = latest_only_uuids
+        self._connection_parameters_request = None
         self._event_loop = None
-        self._event_loop_ready = threading.Event()
+        self._loop_tasks = set()  # Tasks created in the event loop (keeps task references until completion)
+        # Writes waiting to be processed by a single drain task in the event loop
+        self._pending_writes = collections.deque()
+        self._pending_writes_lock = threading.Lock()
+        self._write_drain_scheduled = False
         self._event_notifier = None
         self._is_disconnecting = False
         self._expect_disconnection = False
         # Logger
-        self.logger = logging.getLogger(__name__)
+        self.logger = _logger
         # GATT profile
         self._gatt_profile = get_usb_gatt_profile()
 
@@ -529,22 +735,17 @@ class BleInterface(BeltCommunicationInterface, threading.Thread):
             self.logger.error("BleInterface: Belt already connected!")
             return
         # Start event notifier
-        self._event_notifier = BleEventNotifier(self._delegate, self)
+        self._event_notifier = BleEventNotifier(self._delegate, self, self._latest_only_uuids)
         self._event_notifier.start()
-        # Start thread and loop
-        self._event_loop_ready.clear()
-        self.start()
-        self._event_loop_ready.wait(EVENT_LOOP_READY_TIMEOUT)
+        # Use the shared event loop (started on first connection)
+        self._event_loop = _get_ble_event_loop()
         # Retrieve device
         self._device = device
         if self._device is None:
             try:
-                # Use belt scanner to find the first belt
-                belts = []
+                # Use belt scanner to find the first belt (the scan stops as soon as a belt is found)
                 with belt_scanner.create() as scanner:
-                    belts = scanner.scan()
-                if not belts:
-                    self._device = belts[0]
+                    self._device = scanner.find_first()
             except:
                 self.logger.exception("BleInterface: Error when scanning!")
                 self.close()
@@ -598,15 +799,160 @@ class BleInterface(BeltCommunicationInterface, threading.Thread):
         except:
             self.logger.exception("BleInterface: Error when connecting!")
             return False
+        self._connected = True
         self.logger.debug("BleInterface: Client connected.")
+        if self._throughput_optimized:
+            self._request_throughput_optimized_parameters()
         return True
 
+    def _run_operation(self, coroutine) -> bool:
+        """
+        Runs a GATT operation in the event loop and waits for its result.
+        The operation is rejected when called from the event loop thread, as waiting would block the loop.
+        :param coroutine: The coroutine of the operation.
+        :return: The result of the operation, 'False' when called from the event loop thread.
+        """
+        if self._in_event_loop_thread():
+            coroutine.close()
+            self.logger.error("BleInterface: GATT operations cannot be waited for in the event loop thread!")
+            return False
+        # Note: Lighter than 'run_coroutine_threadsafe', the operation is never cancelled from the caller thread
+        future = concurrent.futures.Future()
+
+        def on_done(task):
+            if task.cancelled():
+                future.cancel()
+            elif task.exception() is not None:
+                future.set_exception(task.exception())
+            else:
+                future.set_result(task.result())
+
+        def start():
+            self._event_loop.create_task(coroutine).add_done_callback(on_done)
+
+        self._event_loop.call_soon_threadsafe(start, context=_BLE_CALLBACK_CONTEXT)
+        return future.result()
+
+    def _queue_write(self, gatt_char, data, with_response) -> _PendingWrite:
+        """
+        Queues a write operation. Writes queued in a burst are processed by one drain task, so that the event loop is
+        woken up once for all of them.
+        :param GattCharacteristic gatt_char: The characteristic to write.
+        :param bytes data: The data to write.
+        :param bool with_response: 'True' to write with response, 'False' to write without response.
+        :return: The pending write operation to wait for.
+        """
+        pending_write = _PendingWrite(gatt_char, data, with_response)
+        self._pending_writes.append(pending_write)
+        with self._pending_writes_lock:
+            start_drain = not self._write_drain_scheduled
+            self._write_drain_scheduled = True
+        if start_drain:
+            try:
+                self._event_loop.call_soon_threadsafe(self._start_write_drain, context=_BLE_CALLBACK_CONTEXT)
+            except Exception:
+                # Event loop closed
+                self.logger.exception("BleInterface: Error when scheduling write operations!")
+                self._abort_pending_writes()
+        return pending_write
+
+    def _start_write_drain(self):
+        """
+        Starts the drain task of pending writes (in the event loop).
+        """
+        try:
+            task = self._event_loop.create_task(self._drain_writes())
+        except Exception:
+            self.logger.exception("BleInterface: Error when starting write operations!")
+            self._abort_pending_writes()
+            return
+        self._loop_tasks.add(task)
+        task.add_done_callback(self._loop_tasks.discard)
+
+    def _abort_pending_writes(self):
+        """
+        Completes all pending writes as failed and allows a new drain task to be scheduled. Used when the drain task
+        cannot be started, the writes queued meanwhile would never be processed otherwise.
+        """
+        with self._pending_writes_lock:
+            self._write_drain_scheduled = False
+            while self._pending_writes:
+                self._pending_writes.popleft().complete(False)
+
+    async def _drain_writes(self):
+        """
+        Processes pending writes in order until the queue is empty.
+        """
+        while True:
+            try:
+                pending_write = self._pending_writes.popleft()
+            except IndexError:
+                with self._pending_writes_lock:
+                    if not self._pending_writes:
+                        self._write_drain_scheduled = False
+                        return
+                continue
+            success = False
+            try:
+                success = await self._write_gatt_char(
+                    pending_write.gatt_char, pending_write.data, pending_write.with_response)
+            except Exception:
+                self.logger.exception("BleInterface: Error when writing characteristic.")
+            finally:
+                pending_write.complete(success)
+
+    def _in_event_loop_thread(self) -> bool:
+        """
+        Checks if the caller runs in the event loop thread.
+        :return: 'True' if the caller runs in the event loop thread.
+        """
+        return threading.current_thread() is _ble_event_loop_thread
+
+    def _request_throughput_optimized_parameters(self):
+        """
+        Requests throughput-optimized connection parameters (Windows 11 only).
+
+        Bleak does not expose the WinRT device, it is taken from the private attributes of the WinRT backend of Bleak
+        (`BleakClient._backend._requester`, checked against Bleak 3.0.2). The request is skipped when these attributes
+        are not available.
+        """
+        if sys.platform != "win32":
+            self.logger.debug("BleInterface: Connection parameters request only supported on Windows.")
+            return
+        requester = getattr(getattr(self._gatt_client, "_backend", None), "_requester", None)
+        if requester is None or not hasattr(requester, "request_preferred_connection_parameters"):
+            self.logger.warning("BleInterface: Connection parameters request not supported by this Bleak version!")
+            return
+        try:
+            from winrt.windows.devices.bluetooth import BluetoothLEPreferredConnectionParameters
+            # Note: The request remains active until it is closed
+            self._connection_parameters_request = requester.request_preferred_connection_parameters(
+                BluetoothLEPreferredConnectionParameters.throughput_optimized)
+            self.logger.debug("BleInterface: Throughput-optimized connection parameters requested.")
+        except Exception:
+            self.logger.debug("BleInterface: Connection parameters request failed.", exc_info=True)
+            self.logger.warning("BleInterface: Connection parameters request not supported!")
+
+    def _release_connection_parameters_request(self):
+        """
+        Closes the request of connection parameters if any.
+        """
+        if self._connection_parameters_request is None:
+            return
+        try:
+            self._connection_parameters_request.close()
+        except Exception:
+            self.logger.debug("BleInterface: Failed to close connection parameters request.", exc_info=True)
+        self._connection_parameters_request = None
+
     async def _disconnect(self) -> bool:
         """
         Disconnects the device.
         :return: 'True' if successful, 'False' otherwise.
         """
         success = True
+        self._release_connection_parameters_request()
+        self._connected = False
         try:
             if self._gatt_client is not None:
                 if self._gatt_client.is_connected:
@@ -628,12 +974,9 @@ class BleInterface(BeltCommunicationInterface, threading.Thread):
         :return: 'True' if successful, 'False' otherwise.
         """
         try:
-            if self._gatt_client is None:
+            if self._gatt_client is None or not self._connected:
                 self.logger.warning("BleInterface: No connection to write char!")
                 return False
-            if not self._gatt_client.is_connected:
-                self.logger.warning("BleInterface: No connection to set notifications!")
-                return False
             await self._gatt_client.write_gatt_char(gatt_char.uuid, bytearray(data), response=with_response)
         except:
             self.logger.exception("BleInterface: Error when writing characteristic.")
@@ -648,10 +991,7 @@ class BleInterface(BeltCommunicationInterface, threading.Thread):
         :return: 'True' if successful, 'False' otherwise.
         """
         try:
-            if self._gatt_client is None:
-                self.logger.warning("BleInterface: No connection to set notifications!")
-                return False
-            if not self._gatt_client.is_connected:
+            if self._gatt_client is None or not self._connected:
                 self.logger.warning("BleInterface: No connection to set notifications!")
                 return False
             if enabled:
@@ -671,18 +1011,15 @@ class BleInterface(BeltCommunicationInterface, threading.Thread):
         :return: 'True' if successful, 'False' otherwise.
         """
         try:
-            if self._gatt_client is None:
+            if self._gatt_client is None or not self._connected:
                 self.logger.warning("BleInterface: No connection to read char!")
                 return False
-            if not self._gatt_client.is_connected:
-                self.logger.warning("BleInterface: No connection to set notifications!")
-                return False
             value = await self._gatt_client.read_gatt_char(gatt_char.uuid)
         except:
             self.logger.exception("BleInterface: Error when reading characteristic.")
             return False
         try:
-            self._event_notifier.notify_gatt_notification(gatt_char, bytes(value))
+            self._event_notifier.notify_gatt_notification(gatt_char, value)
         except:
             self.logger.exception("BleInterface: Error when calling delegate method 'on_gatt_char_notified'.")
         return True
@@ -702,6 +1039,7 @@ class BleInterface(BeltCommunicationInterface, threading.Thread):
                     descriptor_handles.append(descriptor.handle)
                 self._gatt_profile.set_char_handles(gatt_char.uuid, bleak_gatt_char.handle, bleak_gatt_char.handle + 1,
                                                     descriptor_handles)
+                self._notified_chars[bleak_gatt_char.handle] = gatt_char
 
     # --------------------------------------------------------------- #
     # Bleak GATT client callback methods
@@ -712,21 +1050,24 @@ class BleInterface(BeltCommunicationInterface, threading.Thread):
         :param BleakGATTCharacteristic characteristic: The characteristic.
         :param bytearray data: The characteristic notified value.
         """
-        gatt_char = self._gatt_profile.get_char_from_handle(characteristic.handle)
+        gatt_char = self._notified_chars.get(characteristic.handle)
         if gatt_char is None:
-            self.logger.debug("BleInterface: Notification on unsupported handle ({})!".format(characteristic.handle))
+            self.logger.debug("BleInterface: Notification on unsupported handle (%s)!", characteristic.handle)
             return
+        # Note: The delegate is not called from the event loop thread, as delegate methods may wait on the loop
         try:
-            self._event_notifier.notify_gatt_notification(gatt_char, bytes(data))
-        except:
-            self.logger.exception("BleInterface: Failed to access event notifier!")
+            self._event_notifier.notify_gatt_notification_nowait(gatt_char, data)
+        except AttributeError:
+            # Event notifier already cleared (disconnected)
+            pass
 
     def _on_device_disconnected(self, gatt_client):
         """
         Callback on disconnection.
         :param BleakClient gatt_client: The GATT client disconnected.
         """
-        self.logger.debug("BleInterface: Client {} disconnected.".format(gatt_client.address))
+        self.logger.debug("BleInterface: Client %s disconnected.", gatt_client.address)
+        self._connected = False
         if self._gatt_client is None:
             # Connection already closed
             return
@@ -746,15 +1087,9 @@ class BleInterface(BeltCommunicationInterface, threading.Thread):
         # except:
         #     self.logger.exception("BleInterface: Error when scheduling disconnection!")
 
-        # Disconnected
+        # Disconnected (the shared event loop keeps running)
         self._gatt_client = None
-        # Stop event loop
-        try:
-            self.logger.debug("BleInterface: Stop event loop.")
-            self._event_loop.call_soon_threadsafe(self._event_loop.stop)
-        except:
-            self.logger.exception("BleInterface: Error when stopping event loop!")
-        self._event_loop = None
+        self._release_connection_parameters_request()
         # Notify disconnection and stop event notifier
         if self._event_notifier is not None:
             self._event_notifier.notify_disconnection(expected=self._expect_disconnection)
@@ -766,7 +1101,7 @@ class BleInterface(BeltCommunicationInterface, threading.Thread):
         if self._gatt_client is None:
             # Already closed
             return
-        self.logger.debug("BleInterface: Disconnect and stop event loop.")
+        self.logger.debug("BleInterface: Disconnect.")
         # Flag to ignore '_on_device_disconnected' callback
         self._is_disconnecting = True
         try:
@@ -778,14 +1113,8 @@ class BleInterface(BeltCommunicationInterface, threading.Thread):
         except:
             self.logger.exception("BleInterface: Error when scheduling disconnection!")
         self._is_disconnecting = False
+        # Note: The shared event loop keeps running for other interfaces and later connections
         self._gatt_client = None
-        # Stop event loop
-        try:
-            self.logger.debug("BleInterface: Stop event loop.")
-            self._event_loop.call_soon_threadsafe(self._event_loop.stop)
-        except:
-            self.logger.exception("BleInterface: Error when stopping event loop!")
-        self._event_loop = None
         # Notify disconnection and stop event notifier
         if self._event_notifier is not None:
             self._event_notifier.notify_disconnection()
@@ -794,7 +1123,7 @@ class BleInterface(BeltCommunicationInterface, threading.Thread):
         if not self.is_connected():
             # Already disconnected
             return True
-        if threading.current_thread() == self:
+        if self._in_event_loop_thread():
             self.logger.error("BeltController: Cannot wait disconnection from listener thread.")
             return False
         self._expect_disconnection = True
@@ -806,13 +1135,16 @@ class BleInterface(BeltCommunicationInterface, threading.Thread):
         return self._gatt_client is not None
 
     def write_gatt_char(self, gatt_char, data, with_response=True) -> bool:
-        if self._gatt_client is None:
+        if self._gatt_client is None or self._is_disconnecting:
+            # Note: Operations are not scheduled while disconnecting
             self.logger.error("BleInterface: No connection to write char!")
             return False
+        if self._in_event_loop_thread():
+            # Note: Waiting for the queued write would block the event loop
+            self.logger.error("BleInterface: Cannot write char from the event loop thread!")
+            return False
         try:
-            future = asyncio.run_coroutine_threadsafe(self._write_gatt_char(gatt_char, data, with_response),
-                                                      self._event_loop)
-            success = future.result()
+            success = self._queue_write(gatt_char, data, with_response).wait()
             if not success:
                 self.logger.error("BleInterface: Failed to write char!")
                 return False
@@ -822,13 +1154,12 @@ class BleInterface(BeltCommunicationInterface, threading.Thread):
         return True
 
     def set_gatt_notifications(self, gatt_char, enabled) -> bool:
-        if self._gatt_client is None:
+        if self._gatt_client is None or self._is_disconnecting:
+            # Note: Operations are not scheduled while disconnecting
             self.logger.error("BleInterface: No connection to set notifications!")
             return False
         try:
-            future = asyncio.run_coroutine_threadsafe(
-                self._set_gatt_notifications(gatt_char, enabled), self._event_loop)
-            success = future.result()
+            success = self._run_operation(self._set_gatt_notifications(gatt_char, enabled))
             if not success:
                 self.logger.error("BleInterface: Failed to set notification!")
                 return False
@@ -838,13 +1169,12 @@ class BleInterface(BeltCommunicationInterface, threading.Thread):
         return True
 
     def read_gatt_char(self, gatt_char) -> bool:
-        if self._gatt_client is None:
+        if self._gatt_client is None or self._is_disconnecting:
+            # Note: Operations are not scheduled while disconnecting
             self.logger.error("BleInterface: No connection to read characteristic!")
             return False
         try:
-            future = asyncio.run_coroutine_threadsafe(
-                self._read_gatt_char(gatt_char), self._event_loop)
-            success = future.result()
+            success = self._run_operation(self._read_gatt_char(gatt_char))
             if not success:
                 self.logger.error("BleInterface: Failed to read characteristic!")
                 return False
@@ -859,104 +1189,146 @@ class BleInterface(BeltCommunicationInterface, threading.Thread):
     def get_max_packet_size(self) -> int:
         return 244 # 244 bytes using GATT with DLE
 
-    # --------------------------------------------------------------- #
-    # Implementation of Thread methods
-
-    def run(self):
-        try:
-            # Create loop
-            self._event_loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(self._event_loop)
-            # Start loop
-            self.logger.debug("BleInterface: Event loop started.")
-            self._event_loop_ready.set()
-            self._event_loop.run_forever()
-        except:
-            self.logger.exception("BleInterface: Error in event loop.")
-            self.close()
-
 
 class BleEventNotifier(threading.Thread):
     """
     A thread to notify the BLE delegate of events.
     This is necessary to isolate the BLE client that runs in an event loop.
+
+    Events are queued directly from the event loop thread and dispatched by this single thread, i.e. one thread hop
+    per event and delegate calls in order. The delegate cannot run in the event loop thread because synchronous GATT
+    operations called from the delegate wait for the event loop.
     """
 
-    EVENT_CONNECTION = "EVENT_CONNECTION"
-    EVENT_DISCONNECTION = "EVENT_DISCONNECTION"
-    EVENT_GATT_NOTIFICATION = "EVENT_GATT_NOTIFICATION"
+    EVENT_CONNECTION = 0
+    EVENT_DISCONNECTION = 1
+    EVENT_GATT_NOTIFICATION = 2
+    EVENT_LATEST_GATT_NOTIFICATION = 3
 
-    def __init__(self, delegate, ble_interface):
+    def __init__(self, delegate, ble_interface, latest_only_uuids=None):
         """
         Constructor with a delegate for notifications.
         :param BeltCommunicationDelegate delegate: The delegate that handles notifications.
         :param BleInterface ble_interface: The BLE interface.
+        :param Iterable[str] latest_only_uuids: UUIDs of characteristics for which only the latest pending notification
+            is passed to the delegate, or 'None' to pass all notifications.
         """
         threading.Thread.__init__(self, name="BleDelegateNotifier")
         # Delegate and BLE interface
         self._delegate = delegate
         self._ble_interface = ble_interface
-        # Notification queue
-        self._notification_queue = queue.Queue()
+        # Delegate methods resolved once
+        self._on_gatt_char_notified = delegate.on_gatt_char_notified
+        self._on_connection_established = delegate.on_connection_established
+        self._on_connection_closed = delegate.on_connection_closed
+        # Notification queue (unbounded, without the condition variables of queue.Queue)
+        self._notification_queue = queue.SimpleQueue()
+        # Flag set when the thread is started and cleared when it stops (cheaper than 'is_alive()')
+        self._running = False
+        # Latest pending notification values by characteristic, for latest-only characteristics
+        self._latest_only_uuids = frozenset(uuid.lower() for uuid in latest_only_uuids or ())
+        self._latest_values = {}
+        self._latest_values_lock = threading.Lock()
+        # Event handlers by event type, a handler returns 'True' to stop the thread
+        self._event_handlers = {
+            self.EVENT_GATT_NOTIFICATION: self._handle_gatt_notification,
+            self.EVENT_LATEST_GATT_NOTIFICATION: self._handle_latest_gatt_notification,
+            self.EVENT_CONNECTION: self._handle_connection,
+            self.EVENT_DISCONNECTION: self._handle_disconnection
+        }
         # Logger
-        self.logger = logging.getLogger(__name__)
+        self.logger = _logger
+
+    def start(self):
+        # Note: Set before starting the thread so that events notified right after 'start()' are not dropped
+        self._running = True
+        threading.Thread.start(self)
 
     def run(self):
         self.logger.debug("BleDelegateNotifier: Delegate notifier started.")
+        event_handlers = self._event_handlers
         while True:
             # Wait for next event
             event = self._notification_queue.get()
-            if isinstance(event, tuple) and len(event) > 0:
-
-                if event[0] == self.EVENT_CONNECTION:
-                    try:
-                        self._delegate.on_connection_established()
-                    except:
-                        self.logger.exception("BleDelegateNotifier: Unable to notify connection!")
-
-                elif event[0] == self.EVENT_DISCONNECTION:
-                    # Clear notifier reference in controller
-                    try:
-                        self._ble_interface._event_notifier = None
-                    except:
-                        self.logger.exception("BeltEventNotifier: Unable to clear event notifier reference!")
-                    # Notify disconnection
-                    try:
-                        self._delegate.on_connection_closed(expected=event[1])
-                    except:
-                        self.logger.exception("BleDelegateNotifier: Unable to notify disconnection!")
-                    # Stop thread
-                    break
-
-                elif event[0] == self.EVENT_GATT_NOTIFICATION:
-                    try:
-                        self._delegate.on_gatt_char_notified(event[1], event[2])
-                    except:
-                        self.logger.exception("BleDelegateNotifier: Unable to notify GATT char notification!")
-
-                else:
-                    self.logger.warning("BleDelegateNotifier: Unknown event!")
-            else:
+            handler = event_handlers.get(event[0])
+            if handler is None:
                 self.logger.warning("BleDelegateNotifier: Unknown event!")
+            elif handler(event):
+                # Stop thread
+                break
 
+        self._running = False
         self.logger.debug("BeltEventNotifier: Event notifier stopped.")
 
+    def _handle_gatt_notification(self, event) -> bool:
+        try:
+            self._on_gatt_char_notified(event[1], event[2])
+        except:
+            self.logger.exception("BleDelegateNotifier: Unable to notify GATT char notification!")
+        return False
+
+    def _handle_latest_gatt_notification(self, event) -> bool:
+        with self._latest_values_lock:
+            data = self._latest_values.pop(event[1])
+        try:
+            self._on_gatt_char_notified(event[1], data)
+        except:
+            self.logger.exception("BleDelegateNotifier: Unable to notify GATT char notification!")
+        return False
+
+    def _handle_connection(self, event) -> bool:
+        try:
+            self._on_connection_established()
+        except:
+            self.logger.exception("BleDelegateNotifier: Unable to notify connection!")
+        return False
+
+    def _handle_disconnection(self, event) -> bool:
+        # Clear notifier reference in controller
+        try:
+            self._ble_interface._event_notifier = None
+        except:
+            self.logger.exception("BeltEventNotifier: Unable to clear event notifier reference!")
+        # Notify disconnection
+        try:
+            self._on_connection_closed(expected=event[1])
+        except:
+            self.logger.exception("BleDelegateNotifier: Unable to notify disconnection!")
+        return True
+
     def notify_gatt_notification(self, gatt_char, data):
         """
         Notifies asynchronously the delegate of a GATT notification.
         :param gatt_char: The GATT characteristic on which the notification has been received.
         :param data: The data received.
         """
-        if self.is_alive():
+        if self._running:
             self._notification_queue.put((self.EVENT_GATT_NOTIFICATION, gatt_char, data))
         else:
             self.logger.warning("BeltEventNotifier: No GATT notification as the notifier thread is stopped!")
 
+    def notify_gatt_notification_nowait(self, gatt_char, data):
+        """
+        Notifies asynchronously the delegate of a GATT notification, without checking the notifier thread state.
+        Used from the BLE event loop for inbound notifications. For latest-only characteristics, a notification
+        replaces the previous one if the delegate has not received it yet.
+        :param gatt_char: The GATT characteristic on which the notification has been received.
+        :param data: The data received.
+        """
+        if self._latest_only_uuids and gatt_char._uuid_lower in self._latest_only_uuids:
+            with self._latest_values_lock:
+                pending = gatt_char in self._latest_values
+                self._latest_values[gatt_char] = data
+            if not pending:
+                self._notification_queue.put_nowait((self.EVENT_LATEST_GATT_NOTIFICATION, gatt_char))
+            return
+        self._notification_queue.put_nowait((self.EVENT_GATT_NOTIFICATION, gatt_char, data))
+
     def notify_connection(self):
         """
         Notifies asynchronously the delegate that a connection has been established.
         """
-        if self.is_alive():
+        if self._running:
             self._notification_queue.put((self.EVENT_CONNECTION,))
         else:
             self.logger.warning("BeltEventNotifier: No connection notification as the notifier thread is stopped!")
@@ -968,7 +1340,7 @@ class BleEventNotifier(threading.Thread):
         :param expected: True to notify that the disconnection is expected, False if it is an unexpected disconnection.
         :param join: True to wait the end of the event notification thread.
         """
-        if self.is_alive():
+        if self._running:
             self._notification_queue.put((self.EVENT_DISCONNECTION, expected))
             if join:
                 try:
@@ -1,10 +1,15 @@
 # Copyright 2020, feelSpace GmbH, <info@feelspace.de>
 import logging
-from typing import List, Optional
+from typing import List, Optional, Tuple
+
+# Logger (shared by all instances)
+_logger = logging.getLogger(__name__)
 
 
 class GattAttribute:
 
+    __slots__ = ('handle',)
+
     def __init__(self, handle):
         """
         Gatt attribute constructor.
@@ -21,6 +26,8 @@ class GattAttribute:
 
 class GattCharacteristic:
 
+    __slots__ = ('uuid', '_uuid_lower', 'declaration_attr', 'value_attr', 'configuration_attrs', '_cached_handles')
+
     def __init__(self, uuid, declaration_attr, value_attr, configuration_attrs=None):
         """
         Gatt characteristic constructor.
@@ -32,9 +39,11 @@ class GattCharacteristic:
         if configuration_attrs is None:
             configuration_attrs = []
         self.uuid = uuid
+        self._uuid_lower = uuid.lower()
         self.declaration_attr = declaration_attr
         self.value_attr = value_attr
         self.configuration_attrs: List[GattAttribute] = configuration_attrs
+        self._cached_handles = None  # Cached result of 'get_all_handles', cleared when handles are set
 
     def __eq__(self, other):
         return self.uuid == other.uuid
@@ -42,10 +51,15 @@ class GattCharacteristic:
     def __ne__(self, other):
         return not self.__eq__(other)
 
-    def get_all_handles(self) -> [int]:
-        """ Returns the list of all attribute handles covered by this characteristic.
-        :return: the list of all attribute handles covered by this characteristic.
+    def __hash__(self):
+        return hash(self.uuid)
+
+    def get_all_handles(self) -> Tuple[int, ...]:
+        """ Returns all attribute handles covered by this characteristic.
+        :return: the tuple of all attribute handles covered by this characteristic.
         """
+        if self._cached_handles is not None:
+            return self._cached_handles
         handles = []
         if self.declaration_attr.handle is not None:
             handles.append(self.declaration_attr.handle)
@@ -55,7 +69,8 @@ class GattCharacteristic:
             for attr in self.configuration_attrs:
                 if attr.handle is not None:
                     handles.append(attr.handle)
-        return handles
+        self._cached_handles = tuple(handles)
+        return self._cached_handles
 
 
 class NaviBeltGattProfile:
@@ -64,7 +79,7 @@ class NaviBeltGattProfile:
         """ Constructor of a NaviBelt GATT profile.
         """
 
-        self.logger = logging.getLogger(__name__)
+        self.logger = _logger
 
         self.firmware_info_char = GattCharacteristic(
             "0000fe01-0000-1000-8000-00805f9b34fb", GattAttribute(None), GattAttribute(None))
@@ -110,10 +125,13 @@ class NaviBeltGattProfile:
         for char in self.characteristics:
             for handle in char.get_all_handles():
                 self._handles_dict[handle] = char
+        # Characteristics indexed by attribute handle (built from the handles dict)
+        self._handles_array = []
+        self._update_handles_array()
 
         self._char_uuid_dict = {}
         for char in self.characteristics:
-            self._char_uuid_dict[char.uuid.lower()] = char
+            self._char_uuid_dict[char._uuid_lower] = char
 
     def set_char_handles(self, char_uuid, declaration_handle, value_handle, configuration_handles=None):
         """ Sets the attributes handles for a characteristic.
@@ -136,6 +154,7 @@ class NaviBeltGattProfile:
         for handle in characteristic.get_all_handles():
             self._handles_dict.pop(handle, None)
         # Set new handles
+        characteristic._cached_handles = None
         characteristic.declaration_attr.handle = declaration_handle
         characteristic.value_attr.handle = value_handle
         for idx, conf_attr in enumerate(characteristic.configuration_attrs):
@@ -143,6 +162,15 @@ class NaviBeltGattProfile:
         # Adds handles to dict
         for handle in characteristic.get_all_handles():
             self._handles_dict[handle] = characteristic
+        self._update_handles_array()
+
+    def _update_handles_array(self):
+        """ Rebuilds the lookup array of characteristics by attribute handle.
+        """
+        handles_array = [None] * (max(self._handles_dict, default=-1) + 1)
+        for handle, characteristic in self._handles_dict.items():
+            handles_array[handle] = characteristic
+        self._handles_array = handles_array
 
     def get_char_from_handle(self, handle) -> Optional[GattCharacteristic]:
         """ Returns the GATT characteristic that contains the given attribute handle.
@@ -150,8 +178,9 @@ class NaviBeltGattProfile:
         :param int handle: The attribute handle.
         :return: The characteristic that contains the attribute.
         """
-        if handle in self._handles_dict:
-            return self._handles_dict[handle]
+        handles_array = self._handles_array
+        if 0 <= handle < len(handles_array):
+            return handles_array[handle]
         return None
 
     def get_char_from_uuid(self, uuid) -> Optional[GattCharacteristic]:
@@ -160,9 +189,11 @@ class NaviBeltGattProfile:
         :param str uuid: The characteristic UUID.
         :return: The characteristic.
         """
-        if uuid.lower() in self._char_uuid_dict:
-            return self._char_uuid_dict[uuid]
-        return None
+        # Note: Lower case UUIDs (the common case) are found without conversion
+        characteristic = self._char_uuid_dict.get(uuid)
+        if characteristic is None:
+            characteristic = self._char_uuid_dict.get(uuid.lower())
+        return characteristic
 
 
 _usb_gatt_profile = None
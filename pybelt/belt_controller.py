@@ -1,11 +1,16 @@
 # Copyright 2020, feelSpace GmbH, <info@feelspace.de>
 
+import struct
+from contextlib import contextmanager, ExitStack
+
 from pybelt._communication_interface import *
 from pybelt._gatt_profile import *
 from typing import List
 
 WAIT_ACK_TIMEOUT_SEC = 1  # Default timeout for waiting acknowledgment
 DEBUG_MESSAGE_COMPLETION_TIMEOUT = 0.5  # Timeout for waiting the completion of a debug message
+VIBRATION_COMMAND_STRUCT = struct.Struct('<BBHHBHHBHHBB')  # Wire layout of a vibration command
+PULSE_COMMAND_STRUCT = struct.Struct('<BBBHBHBBHHBBB')  # Wire layout of a pulse command
 
 
 class BeltController(BeltCommunicationDelegate):
@@ -17,32 +22,39 @@ class BeltController(BeltCommunicationDelegate):
     # --------------------------------------------------------------- #
     # Public methods
 
-    def __init__(self, delegate=None):
+    def __init__(self, delegate=None, ble_throughput_optimized=False):
         """Initializes the belt controller.
 
         Parameters
         ----------
         :param BeltControllerDelegate delegate:
             The delegate that handles belt events.
+        :param bool ble_throughput_optimized:
+            `True` to request a short connection interval for BLE connections, which reduces the latency of commands.
+            This is only supported on Windows 11 and ignored on other platforms.
         """
         # Logger
         self.logger = logging.getLogger(__name__)
 
+        # BLE connection parameters
+        self._ble_throughput_optimized = ble_throughput_optimized
+
         # Delegates
         self._delegate = delegate
         self._notifications_handlers = []
 
         # Connection state
         self._connection_state = BeltConnectionState.DISCONNECTED
+        self._disconnected_event = threading.Event()
+        self._disconnected_event.set()
 
         # Connection
         self._communication_interface = None
         self._last_connected_interface = None
 
-        # Packet ack
-        self._ack_char = None
-        self._ack_data = None
-        self._ack_event = threading.Event()
+        # Packet acks, list of pending (ack_char, ack_data, event) waited for
+        self._pending_acks = []
+        self._pending_acks_lock = threading.Lock()
 
         # GATT profile
         self._gatt_profile = None
@@ -79,7 +91,7 @@ class BeltController(BeltCommunicationDelegate):
                 self._communication_interface.open(belt)
             else:
                 # Bluetooth connection
-                self._communication_interface = BleInterface(self)
+                self._communication_interface = BleInterface(self, self._ble_throughput_optimized)
                 self._communication_interface.open(belt)
         except:
             self.logger.exception("BeltController: Connection failed.")
@@ -121,12 +133,29 @@ class BeltController(BeltCommunicationDelegate):
     def disconnect_belt(self):
         """Disconnects the belt.
         """
-        if (self._connection_state == BeltConnectionState.DISCONNECTING or
-                self._connection_state == BeltConnectionState.DISCONNECTED):
+        if self._connection_state in _INACTIVE_CONNECTION_STATES:
             return
         self._set_connection_state(BeltConnectionState.DISCONNECTING)
         self._close_connection()
 
+    def request_disconnect(self):
+        """Starts the disconnection of the belt and returns without waiting.
+
+        Use `wait_disconnected()` to wait for the end of the disconnection. This permits to disconnect many belts in
+        parallel.
+        """
+        if self._connection_state in _INACTIVE_CONNECTION_STATES:
+            return
+        threading.Thread(target=self.disconnect_belt, name="BeltDisconnectionThread", daemon=True).start()
+
+    def wait_disconnected(self, timeout=None) -> bool:
+        """Waits until the belt is disconnected.
+
+        :param float timeout: The maximum waiting time in seconds, or `None` to wait without timeout.
+        :return: `True` if the belt is disconnected, `False` if the timeout is reached.
+        """
+        return self._disconnected_event.wait(timeout)
+
     def get_connection_state(self) -> int:
         """Returns the connection state.
         :return: The connection state.
@@ -230,49 +259,20 @@ class BeltController(BeltCommunicationDelegate):
         :return: Returns '0' if successful, '1' when no connection is available or a problem occurs, '2' when the
         timeout is reached.
         """
-        if (self._connection_state == BeltConnectionState.DISCONNECTED or
-                self._connection_state == BeltConnectionState.DISCONNECTING):
+        if self._connection_state in _INACTIVE_CONNECTION_STATES:
             self.logger.error("BeltController: No connection to send packet.")
             return 1
-        # Set ACK
-        if ack_char is not None or ack_data is not None:
-            self._ack_char = ack_char
-            self._ack_data = ack_data
-            self._ack_event.clear()
-        # Send packet
-        try:
-            self.logger.log(5, "BeltController: " + gatt_char.uuid[4:8] + " -> " + bytes_to_hexstr(data))
-        except:
-            pass
-        try:
-            if not self._communication_interface.write_gatt_char(gatt_char, data, with_response=with_response):
-                self.logger.error("BeltController: Error when sending packet.")
-                self._ack_char = None
-                self._ack_data = None
-                self._ack_event.clear()
-                return 1
-        except:
-            self.logger.exception("BeltController: Error when sending packet.")
-            self._ack_char = None
-            self._ack_data = None
-            self._ack_event.clear()
-            return 1
-        # Wait ack
-        if ack_char is not None or ack_data is not None:
-            if not self._ack_event.is_set():
-                # Wait for ACK
-                self._ack_event.wait(timeout_sec)
-            if not self._ack_event.is_set():
-                # Ack not received
+        # Send packet without ACK
+        if ack_char is None and ack_data is None:
+            return self._write_gatt_char(gatt_char, data, with_response)
+        # Send packet and wait ACK
+        with self._pending_ack(ack_char, ack_data) as ack_event:
+            result = self._write_gatt_char(gatt_char, data, with_response)
+            if result != 0:
+                return result
+            if not ack_event.wait(timeout_sec):
                 self.logger.error("BeltController: ACK not received.")
-                self._ack_char = None
-                self._ack_data = None
-                self._ack_event.clear()
                 return 2
-            # Clear ACK flag
-            self._ack_char = None
-            self._ack_data = None
-            self._ack_event.clear()
         return 0
 
     def read_gatt(self, gatt_char, timeout_sec=WAIT_ACK_TIMEOUT_SEC) -> int:
@@ -284,43 +284,22 @@ class BeltController(BeltCommunicationDelegate):
         :return: Returns '0' if successful, '1' when no connection is available or a problem occurs, '2' when the
         timeout is reached.
         """
-        if (self._connection_state == BeltConnectionState.DISCONNECTED or
-                self._connection_state == BeltConnectionState.DISCONNECTING):
+        if self._connection_state in _INACTIVE_CONNECTION_STATES:
             self.logger.error("BeltController: No connection to send packet.")
             return 1
-        # Set ACK
-        self._ack_char = gatt_char
-        self._ack_data = None
-        self._ack_event.clear()
-        # Request value
-        try:
-            if not self._communication_interface.read_gatt_char(gatt_char):
-                self.logger.error("BeltController: Error when requesting characteristic value.")
-                self._ack_char = None
-                self._ack_data = None
-                self._ack_event.clear()
+        with self._pending_ack(gatt_char, None) as ack_event:
+            # Request value
+            try:
+                if not self._communication_interface.read_gatt_char(gatt_char):
+                    self.logger.error("BeltController: Error when requesting characteristic value.")
+                    return 1
+            except Exception:
+                self.logger.exception("BeltController: Error when requesting characteristic value.")
                 return 1
-        except:
-            self.logger.exception("BeltController: Error when requesting characteristic value.")
-            self._ack_char = None
-            self._ack_data = None
-            self._ack_event.clear()
-            return 1
-        # Wait ack
-        if not self._ack_event.is_set():
-            # Wait for ACK
-            self._ack_event.wait(timeout_sec)
-        if not self._ack_event.is_set():
-            # Ack not received
-            self.logger.error("BeltController: ACK not received.")
-            self._ack_char = None
-            self._ack_data = None
-            self._ack_event.clear()
-            return 2
-        # Clear ACK flag
-        self._ack_char = None
-        self._ack_data = None
-        self._ack_event.clear()
+            # Wait ack
+            if not ack_event.wait(timeout_sec):
+                self.logger.error("BeltController: ACK not received.")
+                return 2
         return 0
 
     def add_notifications_handler(self, handler):
@@ -379,7 +358,7 @@ class BeltController(BeltCommunicationDelegate):
         encoded_suffix = None
         try:
             encoded_suffix = suffix.encode()
-        except:
+        except Exception:
             self.logger.exception("BeltController: Unable to encode the belt suffix.")
             return False
         if len(encoded_suffix) > 18:
@@ -591,6 +570,54 @@ class BeltController(BeltCommunicationDelegate):
         :return: `True` if the command has been sent successfully.
         :raise ValueError: If a parameter value is illegal.
         """
+        packet = self.encode_vibration_command(
+            channel_index=channel_index,
+            pattern=pattern,
+            intensity=intensity,
+            orientation_type=orientation_type,
+            orientation=orientation,
+            pattern_iterations=pattern_iterations,
+            pattern_period=pattern_period,
+            pattern_start_time=pattern_start_time,
+            exclusive_channel=exclusive_channel,
+            clear_other_channels=clear_other_channels
+        )
+        return self.send_vibration_packet(packet)
+
+    def encode_vibration_command(
+            self,
+            channel_index,
+            pattern,
+            intensity,
+            orientation_type,
+            orientation,
+            pattern_iterations,
+            pattern_period,
+            pattern_start_time,
+            exclusive_channel,
+            clear_other_channels) -> bytes:
+        """
+        Encodes a command that configures the vibration on a vibration channel, without sending it.
+
+        The encoded command can be sent many times with `send_vibration_packet()`, e.g. for a fixed set of vibration
+        signals.
+
+        :param int channel_index: The channel index to configure. The belt has six channels (index 0 to 5).
+        :param int pattern: The vibration pattern to use, see `BeltVibrationPattern`.
+        :param Union[int,None] intensity: The intensity of the vibration in range [0, 100] or `None` to use the default
+            intensity.
+        :param int orientation_type: The type of signal orientation, see `BeltOrientationType`.
+        :param int orientation: The value of the vibration orientation.
+        :param Union[int,None] pattern_iterations: The number of pattern iterations or `None` to repeat indefinitely the
+            pattern. The maximum value is 127 iterations.
+        :param int pattern_period: The duration in milliseconds of one pattern iteration. The maximum period is 65535
+            milliseconds.
+        :param int pattern_start_time: The starting time in milliseconds of the first pattern iteration.
+        :param bool exclusive_channel: `True` to suspend other channels as long as this vibration is active.
+        :param bool clear_other_channels: `True` to stop and clear other channels when this vibration starts.
+        :return: The encoded command.
+        :raise ValueError: If a parameter value is illegal.
+        """
         if channel_index < 0 or channel_index > 5:
             raise ValueError("Channel index value out of range.")
         if pattern < 0 or pattern > 26:
@@ -605,9 +632,6 @@ class BeltController(BeltCommunicationDelegate):
             raise ValueError("Pattern period value out of range.")
         if pattern_start_time < 0 or pattern_start_time > 65535:
             raise ValueError("Pattern start time value out of range.")
-        if self._connection_state != BeltConnectionState.CONNECTED:
-            self.logger.warning("BeltController: Cannot send a command when not connected.")
-            return False
         # Adjust values
         if intensity is None:
             intensity = 0xAAAA
@@ -615,29 +639,32 @@ class BeltController(BeltCommunicationDelegate):
             orientation = orientation % 360
         if orientation_type == BeltOrientationType.MOTOR_INDEX:
             orientation = orientation % 16
-        # Send command
-        return self.write_gatt(
-            self._gatt_profile.vibration_command_char,
-            bytes([
-                channel_index,
-                pattern,
-                intensity & 0xFF,
-                (intensity >> 8) & 0xFF,
-                0x00,
-                0x00,
-                orientation_type,
-                orientation & 0xFF,
-                (orientation >> 8) & 0xFF,
-                0x00,
-                0x00,
-                (0x00 if pattern_iterations is None else pattern_iterations),
-                pattern_period & 0xFF,
-                (pattern_period >> 8) & 0xFF,
-                pattern_start_time & 0xFF,
-                (pattern_start_time >> 8) & 0xFF,
-                (0x01 if exclusive_channel else 0x00),
-                (0x01 if clear_other_channels else 0x00)
-            ])) == 0
+        return VIBRATION_COMMAND_STRUCT.pack(
+            channel_index,
+            pattern,
+            intensity,
+            0x0000,
+            orientation_type,
+            orientation & 0xFFFF,
+            0x0000,
+            (0x00 if pattern_iterations is None else pattern_iterations),
+            pattern_period,
+            pattern_start_time,
+            (0x01 if exclusive_channel else 0x00),
+            (0x01 if clear_other_channels else 0x00))
+
+    def send_vibration_packet(self, packet) -> bool:
+        """
+        Sends a vibration command encoded with `encode_vibration_command()`.
+
+        :param bytes packet: The encoded vibration command.
+        :return: `True` if the command has been sent successfully.
+        """
+        if self._connection_state != BeltConnectionState.CONNECTED:
+            self.logger.warning("BeltController: Cannot send a command when not connected.")
+            return False
+        # Connection state already checked and no ACK to wait for
+        return self._write_gatt_char(self._gatt_profile.vibration_command_char, packet, True) == 0
 
     def send_pulse_command(
             self,
@@ -701,25 +728,20 @@ class BeltController(BeltCommunicationDelegate):
         # Send command
         return self.write_gatt(
             self._gatt_profile.vibration_command_char,
-            bytes([
+            PULSE_COMMAND_STRUCT.pack(
                 0x40,
                 channel_index,
                 orientation_type,
-                orientation & 0xFF,
-                (orientation >> 8) & 0xFF,
+                orientation & 0xFFFF,
                 intensity,
-                on_duration_ms & 0xFF,
-                (on_duration_ms >> 8) & 0xFF,
+                on_duration_ms,
                 pulse_iterations,
                 (0x00 if series_iterations is None else series_iterations),
-                pulse_period & 0xFF,
-                (pulse_period >> 8) & 0xFF,
-                series_period & 0xFF,
-                (series_period >> 8) & 0xFF,
+                pulse_period,
+                series_period,
                 timer_option,
                 (0x01 if exclusive_channel else 0x00),
-                (0x01 if clear_other_channels else 0x00)
-            ])) == 0
+                (0x01 if clear_other_channels else 0x00))) == 0
 
     def stop_vibration(
             self,
@@ -821,11 +843,16 @@ class BeltController(BeltCommunicationDelegate):
         if self._connection_state == state:
             return
         self._connection_state = state
-        if notify:
-            try:
-                self._delegate.on_connection_state_changed(state, error=error)
-            except:
-                pass
+        if state == BeltConnectionState.DISCONNECTED:
+            self._disconnected_event.set()
+        else:
+            self._disconnected_event.clear()
+        if not notify or self._delegate is None:
+            return
+        try:
+            self._delegate.on_connection_state_changed(state, error=error)
+        except Exception:
+            self.logger.exception("BeltController: Error in connection state delegate method.")
 
     def _close_connection(self):
         """Closes the connection and clear cached parameter values.
@@ -857,58 +884,32 @@ class BeltController(BeltCommunicationDelegate):
         if not self._communication_interface.set_gatt_notifications(self._gatt_profile.param_notification_char, True):
             return False
 
-        # Read belt mode
-        self.logger.debug("BeltController: Read belt mode.")
-        if (self.write_gatt(self._gatt_profile.param_request_char,
-                            b'\x01\x01',
-                            self._gatt_profile.param_notification_char,
-                            b'\x01\x01') != 0):
-            self.logger.error("BeltController: Failed to request belt mode.")
+        # Read belt mode, default intensity, firmware version, heading offset and compass accuracy signal state
+        # Note: All requests are sent back-to-back and the acknowledgments are waited for together, so that the
+        # handshake takes a single round-trip instead of one per parameter.
+        self.logger.debug("BeltController: Read belt parameters.")
+        param_request_char = self._gatt_profile.param_request_char
+        param_notification_char = self._gatt_profile.param_notification_char
+        firmware_info_char = self._gatt_profile.firmware_info_char
+        if not self._send_requests([
+                (param_request_char, b'\x01\x01', param_notification_char, b'\x01\x01'),
+                (param_request_char, b'\x01\x02', param_notification_char, b'\x01\x02'),
+                (firmware_info_char, None, firmware_info_char, None),
+                (param_request_char, b'\x01\x03', param_notification_char, b'\x01\x03'),
+                (param_request_char, b'\x10\x01\x03', param_notification_char, b'\x10\x03')]):
+            self.logger.error("BeltController: Failed to request belt parameters.")
             return False
         if self._belt_mode is None:
             self.logger.error("BeltController: Failed to read belt mode.")
             return False
-
-        # Read default intensity
-        self.logger.debug("BeltController: Read default intensity.")
-        if (self.write_gatt(self._gatt_profile.param_request_char,
-                            b'\x01\x02',
-                            self._gatt_profile.param_notification_char,
-                            b'\x01\x02') != 0):
-            self.logger.error("BeltController: Failed to request default intensity.")
-            return False
         if self._default_intensity is None:
             self.logger.error("BeltController: Failed to read default intensity.")
             return False
-
-        # Read firmware version
-        self.logger.debug("BeltController: Read firmware version.")
-        if self.read_gatt(self._gatt_profile.firmware_info_char) != 0:
-            self.logger.error("BeltController: Failed to request firmware version.")
-            return False
         if self._firmware_version is None:
             self.logger.error("BeltController: Failed to read firmware version.")
             return False
-
-        # Read heading offset
-        self.logger.debug("BeltController: Read heading offset.")
-        if (self.write_gatt(self._gatt_profile.param_request_char,
-                            b'\x01\x03',
-                            self._gatt_profile.param_notification_char,
-                            b'\x01\x03') != 0):
-            self.logger.error("BeltController: Failed to request default intensity.")
-            return False
         if self._heading_offset is None:
-            self.logger.error("BeltController: Failed to read default intensity.")
-            return False
-
-        # Read compass accuracy signal state
-        self.logger.debug("BeltController: Read compass accuracy signal state.")
-        if (self.write_gatt(self._gatt_profile.param_request_char,
-                            b'\x10\x01\x03',
-                            self._gatt_profile.param_notification_char,
-                            b'\x10\x03') != 0):
-            self.logger.error("BeltController: Failed to request compass accuracy signal state.")
+            self.logger.error("BeltController: Failed to read heading offset.")
             return False
         if self._inaccurate_signal_state is None:
             self.logger.error("BeltController: Failed to read compass accuracy signal state.")
@@ -941,8 +942,7 @@ class BeltController(BeltCommunicationDelegate):
         :param int belt_mode:
             The belt mode to set.
         """
-        if (self._connection_state == BeltConnectionState.DISCONNECTED or
-                self._connection_state == BeltConnectionState.DISCONNECTING):
+        if self._connection_state in _INACTIVE_CONNECTION_STATES:
             return
         if belt_mode < 0 or belt_mode > 10:
             self.logger.error("BeltController: Illegal belt mode.")
@@ -969,8 +969,7 @@ class BeltController(BeltCommunicationDelegate):
         :param int new_mode:
             The belt mode after the press event.
         """
-        if (self._connection_state == BeltConnectionState.DISCONNECTED or
-                self._connection_state == BeltConnectionState.DISCONNECTING):
+        if self._connection_state in _INACTIVE_CONNECTION_STATES:
             return
         if previous_mode < 0 or previous_mode > 6 or new_mode < 0 or new_mode > 6 or button_id < 1 or button_id > 4:
             self.logger.error("BeltController: Illegal button press event argument.")
@@ -987,8 +986,7 @@ class BeltController(BeltCommunicationDelegate):
 
         :param intensity: The default intensity to set.
         """
-        if (self._connection_state == BeltConnectionState.DISCONNECTED or
-                self._connection_state == BeltConnectionState.DISCONNECTING):
+        if self._connection_state in _INACTIVE_CONNECTION_STATES:
             return
         if intensity < 0 or intensity > 100:
             self.logger.error("BeltController: Illegal intensity notification argument.")
@@ -1005,8 +1003,7 @@ class BeltController(BeltCommunicationDelegate):
 
         :param int offset: The offset value.
         """
-        if (self._connection_state == BeltConnectionState.DISCONNECTED or
-                self._connection_state == BeltConnectionState.DISCONNECTING):
+        if self._connection_state in _INACTIVE_CONNECTION_STATES:
             return
         if offset < 0 or offset > 359:
             self.logger.error("BeltController: Illegal offset notification argument.")
@@ -1023,8 +1020,7 @@ class BeltController(BeltCommunicationDelegate):
 
         :param bytearray bt_name: The BT name.
         """
-        if (self._connection_state == BeltConnectionState.DISCONNECTED or
-                self._connection_state == BeltConnectionState.DISCONNECTING):
+        if self._connection_state in _INACTIVE_CONNECTION_STATES:
             return
         bt_name = decode_ascii(bt_name)
         try:
@@ -1038,8 +1034,7 @@ class BeltController(BeltCommunicationDelegate):
 
         :param int state: The signal state.
         """
-        if (self._connection_state == BeltConnectionState.DISCONNECTED or
-                self._connection_state == BeltConnectionState.DISCONNECTING):
+        if self._connection_state in _INACTIVE_CONNECTION_STATES:
             return
         enabled_in_compass = (state == 1) or (state == 3)
         enabled_in_app = (state == 2) or (state == 3)
@@ -1054,8 +1049,7 @@ class BeltController(BeltCommunicationDelegate):
         Notifies the delegate of the pairing requirement state.
         :param pairing_required: 'True' if pairing is required.
         """
-        if (self._connection_state == BeltConnectionState.DISCONNECTED or
-                self._connection_state == BeltConnectionState.DISCONNECTING):
+        if self._connection_state in _INACTIVE_CONNECTION_STATES:
             return
         try:
             self._delegate.on_pairing_requirement_notified(pairing_required)
@@ -1067,8 +1061,7 @@ class BeltController(BeltCommunicationDelegate):
 
         :param bytes packet: The raw orientation data.
         """
-        if (self._connection_state == BeltConnectionState.DISCONNECTED or
-                self._connection_state == BeltConnectionState.DISCONNECTING):
+        if self._connection_state in _INACTIVE_CONNECTION_STATES:
             return
         sensor_id = int.from_bytes(
             bytes(packet[0:1]),
@@ -1137,8 +1130,7 @@ class BeltController(BeltCommunicationDelegate):
 
         :param bytes packet: The raw battery status data.
         """
-        if (self._connection_state == BeltConnectionState.DISCONNECTED or
-                self._connection_state == BeltConnectionState.DISCONNECTING):
+        if self._connection_state in _INACTIVE_CONNECTION_STATES:
             return
         bat_stat = int.from_bytes(
             bytes(packet[0:1]),
@@ -1169,22 +1161,99 @@ class BeltController(BeltCommunicationDelegate):
         except:
             pass
 
-    def _is_ack(self, gatt_char, data) -> bool:
+    def _send_requests(self, requests, timeout_sec=WAIT_ACK_TIMEOUT_SEC) -> bool:
         """
-        Checks if the data corresponds to the current acknowledgment.
+        Sends several requests back-to-back and waits for all their acknowledgments.
 
+        :param list requests: The requests as tuples (gatt_char, data, ack_char, ack_data). When 'data' is 'None' the
+            value of 'gatt_char' is read instead of written.
+        :param float timeout_sec: The timeout period in seconds for receiving all acknowledgments.
+        :return: 'True' if all requests have been acknowledged, 'False' otherwise.
+        """
+        if self._connection_state in _INACTIVE_CONNECTION_STATES:
+            self.logger.error("BeltController: No connection to send packet.")
+            return False
+        with ExitStack() as ack_scopes:
+            # Set ACKs before sending, notifications may be received before the last request is sent
+            ack_events = [ack_scopes.enter_context(self._pending_ack(ack_char, ack_data))
+                          for _, _, ack_char, ack_data in requests]
+            # Send requests
+            try:
+                for gatt_char, data, _, _ in requests:
+                    if data is None:
+                        if not self._communication_interface.read_gatt_char(gatt_char):
+                            self.logger.error("BeltController: Error when requesting characteristic value.")
+                            return False
+                    elif not self._communication_interface.write_gatt_char(gatt_char, data):
+                        self.logger.error("BeltController: Error when sending packet.")
+                        return False
+            except Exception:
+                self.logger.exception("BeltController: Error when sending packets.")
+                return False
+            # Wait ACKs
+            deadline = time.perf_counter() + timeout_sec
+            for ack_event in ack_events:
+                if not ack_event.wait(max(0.0, deadline - time.perf_counter())):
+                    self.logger.error("BeltController: ACK not received.")
+                    return False
+        return True
+
+    def _write_gatt_char(self, gatt_char, data, with_response) -> int:
+        """
+        Sends data to a GATT characteristic without waiting for an acknowledgment.
+
+        :param GattCharacteristic gatt_char: The characteristic to write.
+        :param bytes data: The data to write.
+        :param bool with_response: 'True' to write with response, 'False' to write without response.
+        :return: Returns '0' if successful, '1' when a problem occurs.
+        """
+        if self.logger.isEnabledFor(5):
+            self.logger.log(5, "BeltController: %s -> %s", gatt_char.uuid[4:8], bytes_to_hexstr(data))
+        try:
+            if not self._communication_interface.write_gatt_char(gatt_char, data, with_response=with_response):
+                self.logger.error("BeltController: Error when sending packet.")
+                return 1
+        except Exception:
+            self.logger.exception("BeltController: Error when sending packet.")
+            return 1
+        return 0
+
+    @contextmanager
+    def _pending_ack(self, ack_char, ack_data):
+        """
+        Registers an acknowledgment to wait for, for the duration of the context.
+
+        :param GattCharacteristic ack_char: The characteristic of the acknowledgment, or 'None' for any.
+        :param bytes ack_data: The acknowledgment pattern, or 'None' for any.
+        :return: The event set when the acknowledgment is received.
+        """
+        ack = (ack_char, ack_data, threading.Event())
+        with self._pending_acks_lock:
+            self._pending_acks.append(ack)
+        try:
+            yield ack[2]
+        finally:
+            with self._pending_acks_lock:
+                self._pending_acks.remove(ack)
+
+    def _is_ack(self, ack_char, ack_data, gatt_char, data) -> bool:
+        """
+        Checks if the data corresponds to an acknowledgment.
+
+        :param GattCharacteristic ack_char: The characteristic of the acknowledgment, or 'None' for any.
+        :param bytes ack_data: The acknowledgment pattern, or 'None' for any.
         :param GattCharacteristic gatt_char: The GATT characteristic of the notification.
         :param bytes data: The data received.
         :return: 'True' if the ACK is verified, 'False' otherwise.
         """
         try:
-            if self._ack_char is not None:
-                if self._ack_char != gatt_char:
+            if ack_char is not None:
+                if ack_char != gatt_char:
                     return False
-            if self._ack_data is not None:
-                if len(self._ack_data) > len(data):
+            if ack_data is not None:
+                if len(ack_data) > len(data):
                     return False
-                for packet_byte, ack_byte in zip(data, self._ack_data):
+                for packet_byte, ack_byte in zip(data, ack_data):
                     if ack_byte is not None:
                         if ack_byte != packet_byte:
                             return False
@@ -1331,13 +1400,14 @@ class BeltController(BeltCommunicationDelegate):
 
         # TODO Other notifications
 
-        # Check for ACK
-        if (self._ack_data is not None or self._ack_char is not None) and not self._ack_event.is_set():
-            if self._is_ack(gatt_char, data):
-                self.logger.log(5, "BeltController: Ack data received 0x"+data.hex())
-                self._ack_data = None
-                self._ack_char = None
-                self._ack_event.set()
+        # Check for ACK, a notification acknowledges the first matching pending request
+        if self._pending_acks:
+            with self._pending_acks_lock:
+                for ack_char, ack_data, ack_event in self._pending_acks:
+                    if not ack_event.is_set() and self._is_ack(ack_char, ack_data, gatt_char, data):
+                        self.logger.log(5, "BeltController: Ack data received 0x"+data.hex())
+                        ack_event.set()
+                        break
 
         # Inform system handlers
         for handler in self._notifications_handlers:
@@ -1373,6 +1443,10 @@ class BeltConnectionState:
     DISCONNECTING = 3
 
 
+_INACTIVE_CONNECTION_STATES = frozenset((BeltConnectionState.DISCONNECTED, BeltConnectionState.DISCONNECTING))
+# Connection states in which no packet can be sent or received
+
+
 class BeltMode:
     """Enumeration of belt modes."""
 
@@ -1533,6 +1607,6 @@ class BeltNotificationsHandler:
         Called when a GATT notification has been received or a characteristic has been read.
 
         :param GattCharacteristic gatt_char: The GATT characteristic.
-        :param bytes data: The data received.
+        :param bytes data: The data received (bytes-like object, e.g. bytearray).
         """
         pass
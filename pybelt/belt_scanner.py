@@ -3,11 +3,14 @@
 import asyncio
 import logging
 import threading
-from typing import List
+from typing import List, Optional
 from bleak.backends.device import BLEDevice
 from bleak import BleakScanner
 from contextlib import contextmanager
 
+# Service UUIDs advertised by the belts (in lower case)
+_BELT_SERVICE_UUIDS = ("65333333-a115-11e2-9e9a-0800200ca100", "0000fe51-0000-1000-8000-00805f9b34fb")
+
 
 @contextmanager
 def create():
@@ -56,39 +59,85 @@ class BeltScanner:
             except:
                 pass
 
-    def scan(self) -> List[BLEDevice]:
+    def scan(self, timeout=2.0, name_prefix=None) -> List[BLEDevice]:
         """Scans for advertising belts.
 
-        :return: The available belts.
+        :param float timeout: The duration of the scan in seconds. Long scans should be avoided because some platforms
+            report advertisements less frequently when scanning for a long time.
+        :param str name_prefix: If not `None`, only the belts with a name starting with this prefix are returned.
+        :return: The available belts, each belt address is listed once.
         """
-        future = asyncio.run_coroutine_threadsafe(self._scan(), self._event_loop)
+        future = asyncio.run_coroutine_threadsafe(self._scan(timeout, name_prefix), self._event_loop)
         return future.result()
 
-    async def _scan(self) -> List[BLEDevice]:
+    def find(self, address, timeout=2.0) -> Optional[BLEDevice]:
+        """Looks for an advertising belt from its address.
+
+        The scan stops as soon as the belt is found.
+
+        :param str address: The address of the belt.
+        :param float timeout: The maximum duration of the scan in seconds.
+        :return: The belt, or `None` if the belt has not been found.
+        """
+        future = asyncio.run_coroutine_threadsafe(self._find(address, timeout), self._event_loop)
+        return future.result()
+
+    def find_first(self, timeout=2.0, name_prefix=None) -> Optional[BLEDevice]:
+        """Looks for the first advertising belt.
+
+        The scan stops as soon as a belt is found.
+
+        :param float timeout: The maximum duration of the scan in seconds.
+        :param str name_prefix: If not `None`, only a belt with a name starting with this prefix is returned.
+        :return: The first belt found, or `None` if no belt has been found.
+        """
+        future = asyncio.run_coroutine_threadsafe(self._find_first(timeout, name_prefix), self._event_loop)
+        return future.result()
+
+    async def _find(self, address, timeout) -> Optional[BLEDevice]:
+        """Looks for an advertising belt from its address (asynchronous).
+        """
+        self._logger.debug("BeltScanner: Start async search of %s.", address)
+        device = await BleakScanner.find_device_by_address(address, timeout=timeout)
+        self._logger.debug("BeltScanner: End async search of %s.", address)
+        return device
+
+    async def _find_first(self, timeout, name_prefix) -> Optional[BLEDevice]:
+        """Looks for the first advertising belt (asynchronous).
+        """
+        self._logger.debug("BeltScanner: Start async search of first belt.")
+        device = await BleakScanner.find_device_by_filter(
+            lambda d, adv_data: self._is_belt(d, adv_data, name_prefix), timeout=timeout)
+        self._logger.debug("BeltScanner: End async search of first belt.")
+        return device
+
+    async def _scan(self, timeout, name_prefix) -> List[BLEDevice]:
         """Scans for advertising belts (asynchronous).
         """
         self._logger.debug("BeltScanner: Start async scan.")
-        belts = []
-        devices = await BleakScanner.discover(return_adv=True, timeout=2.0)
-        for d in devices.values():
+        belts = {}
+        devices = await BleakScanner.discover(return_adv=True, timeout=timeout)
+        for device, adv_data in devices.values():
             self._logger.debug("BeltScanner: Device found.")
-            # Check for service UUID
-            adv_data = d[1]
-            for uuid in adv_data.service_uuids:
-                self._logger.debug("BeltScanner: Advertised UUID {}.".format(uuid))
-                if isinstance(uuid, str) and ("65333333-a115-11e2-9e9a-0800200ca100" in uuid.lower()
-                                              or "0000fe51-0000-1000-8000-00805f9b34fb" in uuid.lower()):
-                    # Check if belt not yet discovered
-                    belt_already_discovered = False
-                    for b in belts:
-                        if isinstance(b.address, str) and isinstance(d[0].address, str) and \
-                                (b.address.lower() == d[0].address.lower()):
-                            belt_already_discovered = True
-                            break
-                    if not belt_already_discovered:
-                        belts.append(d[0])
+            if self._is_belt(device, adv_data, name_prefix):
+                # Keep one device per address
+                address = device.address.lower() if isinstance(device.address, str) else device.address
+                belts.setdefault(address, device)
         self._logger.debug("BeltScanner: End async scan.")
-        return belts
+        return list(belts.values())
+
+    def _is_belt(self, device, adv_data, name_prefix) -> bool:
+        """Checks if an advertising device is a belt.
+        """
+        # Check name
+        if name_prefix is not None and not (device.name or "").startswith(name_prefix):
+            return False
+        # Check for service UUID
+        for uuid in adv_data.service_uuids:
+            self._logger.debug("BeltScanner: Advertised UUID %s.", uuid)
+            if isinstance(uuid, str) and any(belt_uuid in uuid.lower() for belt_uuid in _BELT_SERVICE_UUIDS):
+                return True
+        return False
 
 
 class _EventLoopThread(threading.Thread):
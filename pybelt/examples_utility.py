@@ -5,27 +5,126 @@
 These utility functions are essentially designed for examples and tests run in a terminal and not necessarily adequate
 for other programs.
 """
+import json
 import logging
+import os
+import re
+import signal
 import sys
-import serial
+import threading
+import time
 import pybelt
 
-from serial.tools import list_ports
+from serial.tools.list_ports import comports
 
 from pybelt.belt_controller import BeltController, BeltMode, BeltConnectionState
 from pybelt.belt_scanner import BeltScanner
 
+# Time in seconds during which the list of serial ports is reused
+SERIAL_PORTS_CACHE_TTL = 1.0
 
-def belt_controller_log_to_stdout():
-    """Configures the belt-controller logger to print all debug messages on `stdout`.
+# Last list of serial ports as a tuple (time of the enumeration, list of ports)
+_serial_ports_cache = None
+
+# File in which the belts found by the last BLE scan are saved
+SCAN_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".pybelt_scan_cache.json")
+
+# Time in seconds during which the belts found by the last BLE scan are proposed again
+SCAN_CACHE_TTL = 30.0
+
+# Pattern of USB serial ports on macOS and Linux (excludes e.g. Bluetooth virtual serial ports)
+_USB_SERIAL_PORT_PATTERN = re.compile(r"^/dev/(cu\..*(serial|usb)|tty(USB|ACM))", re.IGNORECASE)
+
+# Handler of the belt-controller logger printing on `stdout`, created once
+_stdout_handler = None
+
+# Thread flushing the output written with `write_stdout()`, started once
+_stdout_flush_thread = None
+
+# Set when output written with `write_stdout()` is waiting to be flushed
+_stdout_pending_event = threading.Event()
+
+
+def belt_controller_log_to_stdout(debug=False):
+    """Configures the belt-controller logger to print messages on `stdout`.
+
+    Only messages of level INFO and above are printed, unless `debug` is `True` or the environment variable
+    `PYBELT_DEBUG` is set to a non-empty value, in which case all debug messages are printed. Calling this function more
+    than once does not add another handler to the logger.
+
+    :param bool debug: `True` to print debug messages.
     """
+    global _stdout_handler
     logger = pybelt.logger
-    logger.setLevel(logging.DEBUG)
-    sh = logging.StreamHandler(sys.stdout)
-    sh_format = logging.Formatter('\033[92m %(levelname)s, %(asctime)s: %(message)s \033[0m')
-    sh.setFormatter(sh_format)
-    sh.setLevel(logging.DEBUG)
-    logger.addHandler(sh)
+    logger.setLevel(logging.DEBUG if debug or os.environ.get("PYBELT_DEBUG") else logging.INFO)
+    if _stdout_handler is None:
+        _stdout_handler = logging.StreamHandler(sys.stdout)
+        _stdout_handler.setFormatter(logging.Formatter('\033[92m %(levelname)s, %(asctime)s: %(message)s \033[0m'))
+        _stdout_handler.setLevel(logging.DEBUG)
+    if _stdout_handler not in logger.handlers:
+        logger.addHandler(_stdout_handler)
+
+
+def start_stdout_periodic_flush(period=0.05):
+    """Starts flushing periodically the output written with `write_stdout()`.
+
+    This reduces the number of writes on the terminal when the examples print frequent updates on `stdout`. The flush
+    thread only wakes up when there is output to flush.
+
+    :param float period: The minimum period between two flushes in seconds.
+    """
+    global _stdout_flush_thread
+    if _stdout_flush_thread is not None:
+        return
+    _stdout_flush_thread = threading.Thread(
+        target=_flush_stdout_loop, args=(period,), name="StdoutFlush", daemon=True)
+    _stdout_flush_thread.start()
+
+
+def write_stdout(text):
+    """Writes on `stdout` without flushing, the text is flushed by the thread started with
+    `start_stdout_periodic_flush()`.
+
+    :param str text: The text to write.
+    """
+    sys.stdout.write(text)
+    _stdout_pending_event.set()
+
+
+def _flush_stdout_loop(period):
+    """Flushes `stdout` when there is pending output (target of the flush thread).
+
+    :param float period: The minimum period between two flushes in seconds.
+    """
+    while True:
+        _stdout_pending_event.wait()
+        # Gather the output written during the period
+        time.sleep(period)
+        _stdout_pending_event.clear()
+        try:
+            sys.stdout.flush()
+        except (OSError, ValueError):
+            # Closed or broken output
+            pass
+
+
+def _cached_comports(ttl=SERIAL_PORTS_CACHE_TTL):
+    """Returns the list of serial ports, reusing the last enumeration if it is recent enough.
+
+    The enumeration of serial ports can be slow on some systems (e.g. on Windows, or with paired Bluetooth serial
+    devices).
+
+    Note: On Windows, pyserial already enumerates the ports with SetupAPI restricted to the 'Ports' and 'Modem' device
+    classes (no WMI query over all PnP entities), so no additional platform-specific filter is applied here.
+
+    :param float ttl: The time in seconds during which a previous enumeration is reused.
+    :return: The list of serial ports.
+    """
+    global _serial_ports_cache
+    now = time.monotonic()
+    if _serial_ports_cache is None or now - _serial_ports_cache[0] >= ttl:
+        _serial_ports_cache = (now, comports())
+    return list(_serial_ports_cache[1])
 
 
 def interactive_belt_connection(belt_controller):
@@ -37,7 +136,10 @@ def interactive_belt_connection(belt_controller):
     """
 
     # List possible interfaces
-    ports = serial.tools.list_ports.comports()
+    ports = _cached_comports()
+    if sys.platform in ("darwin", "linux"):
+        # Only USB serial ports can be used to connect a belt
+        ports = [port for port in ports if _USB_SERIAL_PORT_PATTERN.match(port[0])]
     if ports is None or len(ports) == 0:
         # Only Bluetooth available
         print("No serial port found (USB).")
@@ -49,44 +151,69 @@ def interactive_belt_connection(belt_controller):
         else:
             print("Unrecognized input.")
             return
+    elif len(ports) == 1:
+        # Propose the only serial port, Bluetooth otherwise
+        response = input("Connect the belt via {}? [Y/n]".format(ports[0][0]))
+        if response == "" or response.lower() == "y":
+            selected_interface = ports[0][0]
+        elif response.lower() == "n":
+            selected_interface = "Bluetooth"
+        else:
+            print("Unrecognized input.")
+            return
     else:
-        print("Which interface do you want to use? [1-{}]".format(len(ports)+1))
-        for i, port in enumerate(ports):
-            print("{}. {}".format((i + 1), port[0]))
-        print("{}. Bluetooth.".format(len(ports)+1))
+        # The last entry of the menu is Bluetooth
+        bluetooth_number = len(ports) + 1
+        print("\n".join(["Which interface do you want to use? [1-{}]".format(bluetooth_number)] +
+                        ["{}. {}".format((i + 1), port[0]) for i, port in enumerate(ports)] +
+                        ["{}. Bluetooth.".format(bluetooth_number)]))
         interface_number = input()
         try:
             interface_number_int = int(interface_number)
         except ValueError:
             print("Unrecognized input.")
             return
-        if interface_number_int < 1 or interface_number_int > len(ports)+1:
+        if interface_number_int < 1 or interface_number_int > bluetooth_number:
             print("Unrecognized input.")
             return
-        if interface_number_int == len(ports)+1:
+        if interface_number_int == bluetooth_number:
             selected_interface = "Bluetooth"
         else:
             selected_interface = ports[interface_number_int-1][0]
 
     # Use serial port or Bluetooth to connect belt
     if selected_interface == "Bluetooth":
+        # Propose the belts found by the last scan
+        cached_belt = _select_cached_belt()
+        if cached_belt is not None:
+            with pybelt.belt_scanner.create() as scanner:
+                print("Look for the belt {}.".format(cached_belt[0]))
+                belt = scanner.find(cached_belt[0])
+            if belt is not None:
+                print("Connect the belt.")
+                belt_controller.connect(belt)
+                return
+            print("Belt not found.")
         # Bluetooth scan and connect
         with pybelt.belt_scanner.create() as scanner:
             print("Start BLE scan.")
             belts = scanner.scan()
             print("BLE scan completed.")
-        if len(belts) == 0:
+        _save_scan_cache(belts)
+        belt_count = len(belts)
+        if belt_count == 0:
             print("No belt found.")
             return
-        if len(belts) > 1:
-            print("Select the belt to connect.")
+        if belt_count > 1:
+            belt_list = ["Select the belt to connect."]
             for i, belt in enumerate(belts):
                 advertised_uuid = "Unknown"
                 if 'uuids' in belt.metadata:
                     for uuid in belt.metadata['uuids']:
                         advertised_uuid = uuid
-                print("{}. {} - {} - Adv. UUID {}".format((i + 1), belt.name, belt.address, advertised_uuid))
-            belt_selection = input("[1-{}]".format(len(belts)))
+                belt_list.append("{}. {} - {} - Adv. UUID {}".format((i + 1), belt.name, belt.address, advertised_uuid))
+            print("\n".join(belt_list))
+            belt_selection = input("[1-{}]".format(belt_count))
             try:
                 belt_selection_int = int(belt_selection)
             except ValueError:
@@ -101,6 +228,120 @@ def interactive_belt_connection(belt_controller):
         # Connect belt via serial port
         print("Connect the belt.")
         belt_controller.connect(selected_interface)
+        if belt_controller.get_connection_state() == BeltConnectionState.CONNECTED and sys.platform == "linux":
+            _set_usb_serial_low_latency(selected_interface)
+
+
+def _load_scan_cache(ttl=SCAN_CACHE_TTL):
+    """Returns the belts saved from the last BLE scan.
+
+    :param float ttl: The time in seconds after which the saved belts are ignored.
+    :return: The list of belts as (address, name) tuples, empty if there is no recent scan.
+    """
+    try:
+        if time.time() - os.path.getmtime(SCAN_CACHE_PATH) >= ttl:
+            return []
+        with open(SCAN_CACHE_PATH, "r") as cache_file:
+            return [(belt["address"], belt["name"]) for belt in json.load(cache_file)]
+    except (OSError, ValueError, KeyError, TypeError):
+        return []
+
+
+def _save_scan_cache(belts):
+    """Saves the belts found by a BLE scan.
+
+    :param List[BLEDevice] belts: The belts found.
+    """
+    try:
+        with open(SCAN_CACHE_PATH, "w") as cache_file:
+            json.dump([{"address": belt.address, "name": belt.name} for belt in belts], cache_file)
+    except OSError:
+        pass
+
+
+def _select_cached_belt():
+    """Asks to connect a belt found by the last BLE scan.
+
+    :return: The (address, name) of the selected belt, or `None` to start a new scan.
+    """
+    cached_belts = _load_scan_cache()
+    if len(cached_belts) == 0:
+        return None
+    response = input("Use the {} belt(s) found by the last scan? [y/N]".format(len(cached_belts)))
+    if response.lower() != "y":
+        return None
+    if len(cached_belts) == 1:
+        return cached_belts[0]
+    print("\n".join(["Select the belt to connect."] +
+                    ["{}. {} - {}".format((i + 1), name, address) for i, (address, name) in enumerate(cached_belts)]))
+    belt_selection = input("[1-{}]".format(len(cached_belts)))
+    try:
+        return cached_belts[int(belt_selection) - 1]
+    except (ValueError, IndexError):
+        print("Unrecognized input.")
+        return None
+
+
+def _set_usb_serial_low_latency(port):
+    """Sets the latency timer of a USB serial adapter to 1ms (only Linux).
+
+    The default latency timer of USB serial adapters (16ms) delays the reception of short packets. The latency timer
+    is only available for USB serial adapters (e.g. FTDI), and changing it may require write permission on `sysfs`.
+
+    :param str port: The serial port, e.g. '/dev/ttyUSB0'.
+    """
+    latency_timer_path = "/sys/bus/usb-serial/devices/{}/latency_timer".format(os.path.basename(port))
+    try:
+        with open(latency_timer_path, "w") as latency_timer_file:
+            latency_timer_file.write("1")
+    except OSError:
+        pass
+
+
+def disconnect_belt_on_interrupt(belt_controller):
+    """Disconnects the belt when the script is interrupted with Ctrl+C.
+
+    Note: `atexit` handlers are only called once the (non-daemon) threads of the connection are stopped, so the belt
+    is disconnected directly from the signal handler.
+
+    Note: Signal handlers run in the main thread between two Python instructions. The main thread must not block in an
+    untimed wait (e.g. `Event.wait()` without timeout), which cannot be interrupted on Windows before Python 3.14, so
+    it should wait with a timeout in a loop.
+
+    :param BeltController belt_controller: The belt-controller to disconnect.
+    """
+    def on_interrupt(signum, frame):
+        belt_controller.disconnect_belt()
+        sys.exit(0)
+    signal.signal(signal.SIGINT, on_interrupt)
+
+
+# Names of the belt modes
+_BELT_MODE_NAMES = {
+    BeltMode.STANDBY: "Standby",
+    BeltMode.WAIT: "Wait",
+    BeltMode.COMPASS: "Compass",
+    BeltMode.APP_MODE: "App mode",
+    BeltMode.PAUSE: "Pause",
+    BeltMode.CALIBRATION: "Calibration",
+    BeltMode.CROSSING: "Crossing"
+}
+
+# Names of the belt buttons by ID
+_BELT_BUTTON_NAMES = {
+    1: "Power",
+    2: "Pause",
+    3: "Compass",
+    4: "Home"
+}
+
+# Descriptions of the connection states
+_CONNECTION_STATE_NAMES = {
+    BeltConnectionState.DISCONNECTED: "Disconnected",
+    BeltConnectionState.CONNECTING: "Connecting",
+    BeltConnectionState.CONNECTED: "Connected",
+    BeltConnectionState.DISCONNECTING: "Disconnecting"
+}
 
 
 def belt_mode_to_string(mode) -> str:
@@ -109,21 +350,7 @@ def belt_mode_to_string(mode) -> str:
     :param int mode: The belt mode
     :return: The name of the belt mode.
     """
-    if mode == BeltMode.STANDBY:
-        return "Standby"
-    elif mode == BeltMode.WAIT:
-        return "Wait"
-    elif mode == BeltMode.COMPASS:
-        return "Compass"
-    elif mode == BeltMode.APP_MODE:
-        return "App mode"
-    elif mode == BeltMode.PAUSE:
-        return "Pause"
-    elif mode == BeltMode.CALIBRATION:
-        return "Calibration"
-    elif mode == BeltMode.CROSSING:
-        return "Crossing"
-    return "Unknown"
+    return _BELT_MODE_NAMES.get(mode, "Unknown")
 
 
 def belt_button_id_to_string(button_id) -> str:
@@ -132,15 +359,7 @@ def belt_button_id_to_string(button_id) -> str:
     :param int button_id: The ID of the button.
     :return: The name of the button.
     """
-    if button_id == 1:
-        return "Power"
-    elif button_id == 2:
-        return "Pause"
-    elif button_id == 3:
-        return "Compass"
-    elif button_id == 4:
-        return "Home"
-    return "Unknown"
+    return _BELT_BUTTON_NAMES.get(button_id, "Unknown")
 
 
 def connection_state_to_string(state) -> str:
@@ -149,12 +368,4 @@ def connection_state_to_string(state) -> str:
     :param state: The connection state.
     :return: The string description of the state.
     """
-    if state == BeltConnectionState.DISCONNECTED:
-        return "Disconnected"
-    if state == BeltConnectionState.CONNECTING:
-        return "Connecting"
-    if state == BeltConnectionState.CONNECTED:
-        return "Connected"
-    if state == BeltConnectionState.DISCONNECTING:
-        return "Disconnecting"
-    return "Unknown"
+    return _CONNECTION_STATE_NAMES.get(state, "Unknown")
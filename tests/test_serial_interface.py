@@ -0,0 +1,261 @@
+# Copyright 2026, feelSpace GmbH, <info@feelspace.de>
+
+""" This file contains tests of the serial port interface that do not require a belt.
+
+The serial port is replaced by a fake port that delivers the received bytes in predefined chunks and records the
+written bytes.
+"""
+import collections
+import threading
+import time
+import unittest
+from unittest import mock
+
+import serial
+from pybelt._communication_interface import SerialPortInterface, BeltCommunicationDelegate, ParseMode
+
+# Maximum time in seconds to wait for the listener thread to handle the received bytes
+WAIT_TIMEOUT = 2.0
+
+
+class FakeSerial:
+    """Fake serial port.
+
+    Each chunk passed to `feed()` is returned by a single `read()` call, so that packets can be split across reads.
+    """
+
+    # Responses to written packets, by written packet
+    replies = {}
+
+    def __init__(self, port=None, baudrate=None, timeout=None):
+        self.port = port
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.fail_writes = False
+        self.write_delay = 0.0
+        self.written = []
+        self.is_open = True
+        self._chunks = collections.deque()
+        self._lock = threading.Lock()
+
+    def feed(self, chunk):
+        with self._lock:
+            self._chunks.append(bytes(chunk))
+
+    @property
+    def in_waiting(self) -> int:
+        with self._lock:
+            return len(self._chunks[0]) if self._chunks else 0
+
+    @property
+    def out_waiting(self) -> int:
+        return 0
+
+    def read(self, size=1) -> bytes:
+        with self._lock:
+            if self._chunks:
+                chunk = self._chunks.popleft()
+                if len(chunk) > size:
+                    self._chunks.appendleft(chunk[size:])
+                return chunk[:size]
+        # Nothing received, avoid a busy loop of the listener
+        time.sleep(0.001)
+        return b''
+
+    def write(self, data) -> int:
+        if self.write_delay > 0:
+            time.sleep(self.write_delay)
+        if self.fail_writes:
+            raise serial.SerialException("Write failure.")
+        data = bytes(data)
+        self.written.append(data)
+        reply = self.replies.get(data)
+        if reply is not None:
+            self.feed(reply)
+        return len(data)
+
+    def reset_input_buffer(self):
+        with self._lock:
+            self._chunks.clear()
+
+    def close(self):
+        self.is_open = False
+
+
+class RecordingDelegate(BeltCommunicationDelegate):
+    """Delegate that records the received packets and text lines."""
+
+    def __init__(self):
+        self.packets = []
+        self.lines = []
+
+    def on_gatt_char_notified(self, gatt_char, data):
+        self.packets.append((gatt_char, bytes(data)))
+
+    def on_raw_text_received(self, text):
+        self.lines.append(bytes(text))
+
+
+def wait_until(condition, timeout=WAIT_TIMEOUT) -> bool:
+    """Waits until a condition is verified.
+
+    :param condition: The function checking the condition.
+    :param float timeout: The maximum waiting time in seconds.
+    :return: `True` if the condition is verified, `False` if the timeout is reached.
+    """
+    end_time = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > end_time:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+class TestSerialPortParser(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.delegate = RecordingDelegate()
+        self.interface = SerialPortInterface(self.delegate)
+        profile = self.interface.get_gatt_profile()
+        self.param_request_char = profile.param_request_char
+        self.param_notification_char = profile.param_notification_char
+        self.sensor_notification_char = profile.sensor_notification_char
+        self.param_handle = self.param_notification_char.value_attr.handle
+        self.sensor_handle = self.sensor_notification_char.value_attr.handle
+        # Reply to the dummy request sent when opening the port
+        FakeSerial.replies = {
+            bytes([self.param_request_char.value_attr.handle, 2, 0x01, 0x01]):
+                bytes([self.param_handle, 3, 0x01, 0x01, 0x02])}
+        self.port = None
+
+        def create_port(*args, **kwargs):
+            self.port = FakeSerial(*args, **kwargs)
+            return self.port
+
+        with mock.patch("serial.Serial", side_effect=create_port):
+            self.interface.open("fake", initial_flush=False)
+        self.assertTrue(wait_until(lambda: len(self.delegate.packets) == 1), "No reply to the dummy request.")
+        self.delegate.packets.clear()
+
+    def tearDown(self) -> None:
+        self.interface.close()
+        self.assertFalse(self.interface.is_alive())
+        self.assertFalse(self.port.is_open)
+
+    def test_gatt_packets_split_across_chunks(self):
+        """ Tests that GATT packets are parsed independently of the way they are split in read chunks.
+        """
+        sensor_data = bytes(i & 0xFF for i in range(244))
+        # Two packets in one chunk
+        self.port.feed([self.param_handle, 3, 1, 2, 3, self.param_handle, 1, 9])
+        # Payload split across chunks
+        self.port.feed([self.param_handle, 2, 7])
+        self.port.feed([8])
+        # Header split across chunks
+        self.port.feed([self.param_handle])
+        self.port.feed([1])
+        self.port.feed([5])
+        # Long sensor notification split across chunks, followed by the start of the next packet
+        self.port.feed(bytes([self.sensor_handle, 244]) + sensor_data[:100])
+        self.port.feed(sensor_data[100:200])
+        self.port.feed(sensor_data[200:] + bytes([self.param_handle, 1]))
+        self.port.feed([6])
+        expected = [
+            (self.param_notification_char, b'\x01\x02\x03'),
+            (self.param_notification_char, b'\x09'),
+            (self.param_notification_char, b'\x07\x08'),
+            (self.param_notification_char, b'\x05'),
+            (self.sensor_notification_char, sensor_data),
+            (self.param_notification_char, b'\x06'),
+        ]
+        self.assertTrue(wait_until(lambda: len(self.delegate.packets) >= len(expected)), "Packets not received.")
+        self.assertEqual(self.delegate.packets, expected)
+
+    def test_text_lines_with_invalid_bytes(self):
+        """ Tests that text lines are split on new lines and that incorrect bytes clear the current line.
+        """
+        self.interface.set_parse_mode(ParseMode.TEXT)
+        self.assertTrue(wait_until(lambda: self.interface._pending_parse_mode is None), "Parse mode not changed.")
+        self.port.feed(b"hello\r\nworld\n")
+        self.port.feed(b"ab\x01c\x02d")
+        self.port.feed(b"e\nsplit ")
+        self.port.feed(b"line\n\x80\n")
+        expected = [b'hello\r\n', b'world\n', b'de\n', b'split line\n', b'\n']
+        self.assertTrue(wait_until(lambda: len(self.delegate.lines) >= len(expected)), "Lines not received.")
+        self.assertEqual(self.delegate.lines, expected)
+
+
+class TestSerialPortWrite(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.interface = SerialPortInterface(RecordingDelegate())
+        self.gatt_char = self.interface.get_gatt_profile().vibration_command_char
+        # Port set without starting the listener, only the output is tested
+        self.port = FakeSerial()
+        self.interface._serial_port = self.port
+
+    def _write_concurrently(self, thread_count, packet_count) -> list:
+        """Writes packets from several threads at once.
+
+        :param int thread_count: The number of threads.
+        :param int packet_count: The number of packets written by each thread.
+        :return: The write results of each thread.
+        """
+        results = [[] for _ in range(thread_count)]
+        start_barrier = threading.Barrier(thread_count)
+
+        def write_packets(thread_index):
+            start_barrier.wait()
+            for packet_index in range(packet_count):
+                results[thread_index].append(
+                    self.interface.write_gatt_char(self.gatt_char, bytes([thread_index, packet_index])))
+
+        threads = [threading.Thread(target=write_packets, args=(i,)) for i in range(thread_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(WAIT_TIMEOUT * 5)
+            self.assertFalse(thread.is_alive(), "Write blocked.")
+        return results
+
+    def test_concurrent_writes_order(self):
+        """ Tests that packets written concurrently are all written, in order for each thread.
+        """
+        thread_count = 8
+        packet_count = 100
+        self.port.write_delay = 0.0002
+        results = self._write_concurrently(thread_count, packet_count)
+        for thread_results in results:
+            self.assertEqual(thread_results, [True] * packet_count)
+        # Split the output in packets (handle, length, thread index, packet index)
+        output = b''.join(self.port.written)
+        self.assertEqual(len(output), thread_count * packet_count * 4)
+        packet_indexes = [[] for _ in range(thread_count)]
+        for i in range(0, len(output), 4):
+            self.assertEqual(output[i], self.gatt_char.value_attr.handle)
+            self.assertEqual(output[i + 1], 2)
+            packet_indexes[output[i + 2]].append(output[i + 3])
+        for thread_packet_indexes in packet_indexes:
+            self.assertEqual(thread_packet_indexes, list(range(packet_count)))
+
+    def test_concurrent_writes_failure(self):
+        """ Tests that all writers get the failure when the packets written together cannot be written.
+        """
+        thread_count = 8
+        packet_count = 20
+        # Note: The write delay lets packets of other threads be queued and written together
+        self.port.write_delay = 0.0005
+        self.port.fail_writes = True
+        results = self._write_concurrently(thread_count, packet_count)
+        for thread_results in results:
+            self.assertEqual(thread_results, [False] * packet_count)
+
+    def test_write_closed_port(self):
+        """ Tests that writing on a closed port fails.
+        """
+        self.interface._serial_port = None
+        self.assertFalse(self.interface.write_gatt_char(self.gatt_char, b'\x30\xff'))
+
+
+if __name__ == '__main__':
+    unittest.main()